@@ -0,0 +1,65 @@
+"""Compare the legacy line-based parser with jasco.parse_spectrum.
+
+    python bench/bench_parser.py [--points N] [--repeat R]
+"""
+import argparse
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "bin"))
+from jasco import parse_spectrum  # noqa: E402
+from synth import make_export  # noqa: E402
+
+
+# 旧実装（bin/ir.py から移動前のもの）
+def legacy_extract_xy_data(content):
+    xy_start = content.index("XYDATA") + 1
+    extended_info_index = next((i for i, line in enumerate(content) if '##### Extended Information' in line), None)
+    if extended_info_index is not None:
+        xy_end = extended_info_index - 2
+    else:
+        empty_line_index = next((i for i, line in enumerate(content) if line.strip() == ""), None)
+        xy_end = empty_line_index - 1 if empty_line_index is not None else len(content) - 1
+    return content[xy_start:xy_end + 1]
+
+
+def legacy_parse(raw):
+    content = raw.decode("shift_jis").splitlines()
+    data = [line.split() for line in legacy_extract_xy_data(content) if line.strip()]
+    return pd.DataFrame(data, columns=["X", "Y"]).astype(float)
+
+
+def new_parse(raw):
+    spectrum = parse_spectrum(raw)
+    return pd.DataFrame({"X": spectrum.x, "Y": spectrum.y})
+
+
+def best_of(func, raw, repeat):
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        func(raw)
+        times.append(time.perf_counter() - t0)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--points", type=int, nargs="+", default=[7000, 100000, 500000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'points':>8} {'legacy [s]':>11} {'new [s]':>9} {'speedup':>8}")
+    for points in args.points:
+        raw = make_export(points)
+        pd.testing.assert_frame_equal(legacy_parse(raw), new_parse(raw))
+        t_old = best_of(legacy_parse, raw, args.repeat)
+        t_new = best_of(new_parse, raw, args.repeat)
+        print(f"{points:>8} {t_old:>11.4f} {t_new:>9.4f} {t_old / t_new:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+"""Print the cold import time of the formatter modules against their budgets.
+
+    python bench/import_time.py            # exit 1 if over budget
+    python bench/import_time.py --scale 2  # looser budgets on a slow machine
+
+The budgets and the measurement live in tests/test_import_time.py, which
+pytest runs as part of the test suite; this script only prints a table.
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "tests"))
+from test_import_time import TARGETS, best_of  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--scale", type=float, default=1.0, help="予算に掛ける倍率")
+    args = parser.parse_args()
+
+    status = 0
+    for module, budget, heavy in TARGETS:
+        seconds, loaded = best_of(module, heavy, args.repeat)
+        ok = seconds <= budget * args.scale and not loaded
+        print(f"{module:>13} {seconds:>7.3f} s (budget {budget * args.scale:.2f} s)"
+              + (f"  loaded: {', '.join(loaded)}" if loaded else "")
+              + ("" if ok else "  FAIL"))
+        if not ok:
+            status = 1
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
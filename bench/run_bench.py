@@ -0,0 +1,158 @@
+"""Time each stage of the formatter on synthetic JASCO exports.
+
+    python bench/run_bench.py --points 7000 100000 --files 1 20 --output results.json
+    python bench/run_bench.py --baseline results.json   # exit 1 on regression
+
+Stages are timed separately (best of --repeat runs), then run once more
+under tracemalloc for the peak allocation. Results are written as JSON.
+"""
+import argparse
+import datetime
+import io
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+import matplotlib
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "bin"))
+from jasco.excel import write_wide_workbook, write_workbook  # noqa: E402
+from jasco.npz import write_npz  # noqa: E402
+from jasco.parser import parse_spectrum, read_spectrum  # noqa: E402
+from jasco.plot import draw_preview, new_figure  # noqa: E402
+from jasco.profiles import PROFILES  # noqa: E402
+from synth import make_export_set  # noqa: E402
+
+try:
+    import pandas as pd
+except ImportError:
+    pd = None
+
+
+def measure(func, repeat):
+    """Return (best wall time in seconds, peak traced allocation in bytes)."""
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - t0)
+    tracemalloc.start()
+    try:
+        func()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return min(times), peak
+
+
+def render(spectra, profile):
+    # st.pyplot と同じ条件でPNGにする
+    fig, ax = new_figure(profile)
+    draw_preview(ax, spectra, profile)
+    fig.savefig(io.BytesIO(), format="png", dpi=200, bbox_inches="tight")
+
+
+def stages(exports, profile, legacy=False):
+    """Yield (stage name, callable) for one set of exports."""
+    spectra = [parse_spectrum(data, name) for name, data in exports]
+    yield "parse", lambda: [parse_spectrum(data, name) for name, data in exports]
+    yield "parse_stream", lambda: [read_spectrum(io.BytesIO(data), name) for name, data in exports]
+    if legacy:
+        from bench_parser import legacy_parse
+        yield "parse_legacy", lambda: [legacy_parse(data) for _, data in exports]
+    if pd is not None:
+        yield "dataframe", lambda: [pd.DataFrame({"X": s.x, "Y": s.y}) for s in spectra]
+    yield "excel", lambda: write_workbook(spectra, profile)
+    yield "excel_values", lambda: write_workbook(spectra, profile, display="value")
+    yield "excel_wide", lambda: write_wide_workbook(spectra, profile)
+    yield "render", lambda: render(spectra, profile)
+    yield "npz", lambda: write_npz(spectra, io.BytesIO(), profile=profile)
+
+
+def run(args):
+    profile = PROFILES[args.technique]
+    results = []
+    for files in args.files:
+        for points in args.points:
+            exports = make_export_set(files, points, args.technique, extended=not args.no_extended)
+            for stage, func in stages(exports, profile, args.legacy):
+                if args.stages and stage not in args.stages:
+                    continue
+                seconds, peak = measure(func, args.repeat)
+                results.append({
+                    "stage": stage,
+                    "technique": args.technique,
+                    "files": files,
+                    "points": points,
+                    "bytes": sum(len(data) for _, data in exports),
+                    "seconds": seconds,
+                    "peak_bytes": peak,
+                })
+                print(f"{stage:>13} {files:>4} files x {points:>7} points "
+                      f"{seconds:>9.4f} s {peak / 1e6:>9.1f} MB", file=sys.stderr)
+    return {
+        "meta": {
+            "date": datetime.datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "matplotlib": matplotlib.__version__,
+            "machine": platform.machine(),
+            "cpus": os.cpu_count(),
+            "repeat": args.repeat,
+        },
+        "results": results,
+    }
+
+
+def compare(report, baseline, tolerance):
+    """Return the list of stages slower than baseline by more than tolerance."""
+    def key(r):
+        return r["stage"], r["technique"], r["files"], r["points"]
+
+    old = {key(r): r for r in baseline["results"]}
+    regressions = []
+    for r in report["results"]:
+        base = old.get(key(r))
+        if base is not None and r["seconds"] > base["seconds"] * (1 + tolerance):
+            regressions.append((r, base))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--technique", choices=sorted(PROFILES), default="IR")
+    parser.add_argument("--points", type=int, nargs="+", default=[7000, 100000])
+    parser.add_argument("--files", type=int, nargs="+", default=[1, 20])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--stages", nargs="+", help="測定するステージ（既定: すべて）")
+    parser.add_argument("--no-extended", action="store_true", help="Extended Informationを付けない")
+    parser.add_argument("--legacy", action="store_true", help="旧パーサーも測定する")
+    parser.add_argument("--output", help="結果のJSONの保存先（既定: 標準出力）")
+    parser.add_argument("--baseline", help="比較する過去の結果（JSON）")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="許容する速度低下の割合")
+    args = parser.parse_args()
+
+    report = run(args)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        for r, base in regressions:
+            print(f"regression: {r['stage']} {r['files']} files x {r['points']} points "
+                  f"{base['seconds']:.4f} s -> {r['seconds']:.4f} s", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,100 @@
+"""Synthetic JASCO text exports for benchmarks.
+
+    python bench/synth.py OUT_DIR --files 20 --points 7000 [--technique UV-vis]
+"""
+import argparse
+import os
+
+import numpy as np
+
+# 手法ごとの横軸範囲と単位
+_TECHNIQUES = {
+    "IR": {"first": 4000.0, "last": 400.0, "xunits": "1/CM", "yunits": "%T",
+           "data_type": "INFRARED SPECTRUM", "instrument": "FT/IR-4X"},
+    "UV-vis": {"first": 800.0, "last": 200.0, "xunits": "NANOMETERS", "yunits": "ABSORBANCE",
+               "data_type": "UV/VIS SPECTRUM", "instrument": "V-730"},
+}
+
+
+def make_spectrum(points, technique="IR", seed=0):
+    """Return (x, y) with a few Gaussian bands and noise."""
+    t = _TECHNIQUES[technique]
+    rng = np.random.default_rng(seed)
+    x = np.linspace(t["first"], t["last"], points)
+    bands = np.zeros(points)
+    for _ in range(12):
+        center = rng.uniform(t["last"], t["first"])
+        width = rng.uniform(5, 40)
+        bands += rng.uniform(0.05, 0.6) * np.exp(-((x - center) / width) ** 2)
+    noise = rng.normal(0, 0.002, points)
+    if technique == "IR":
+        y = 100 * np.exp(-bands) + 100 * noise
+    else:
+        y = bands + noise
+    return x, y
+
+
+def make_export(points, technique="IR", extended=True, seed=0, newline="\r\n"):
+    """Build one export as shift_jis bytes, optionally with the Extended Information trailer."""
+    t = _TECHNIQUES[technique]
+    x, y = make_spectrum(points, technique, seed)
+    lines = [
+        f"TITLE\t試料{seed}",
+        f"DATA TYPE\t{t['data_type']}",
+        "ORIGIN\tJASCO",
+        "OWNER\t",
+        "DATE\t24/05/01",
+        "TIME\t10:00:00",
+        f"SPECTROMETER/DATA SYSTEM\tJASCO Corp., {t['instrument']}, Rev. 1.00",
+        "LOCALE\t1041",
+        "RESOLUTION\t",
+        "DELAY TIME\t",
+        f"XUNITS\t{t['xunits']}",
+        f"YUNITS\t{t['yunits']}",
+        f"FIRSTX\t{x[0]:g}",
+        f"LASTX\t{x[-1]:g}",
+        f"NPOINTS\t{points}",
+        f"FIRSTY\t{y[0]:.6f}",
+        f"MAXY\t{y.max():.6f}",
+        f"MINY\t{y.min():.6f}",
+        "XYDATA",
+    ]
+    lines += [f"{a:.4f}\t{b:.6f}" for a, b in zip(x, y)]
+    if extended:
+        lines += [
+            "",
+            "##### Extended Information",
+            "",
+            "[Comments]",
+            f"サンプル名\t試料{seed}",
+            "測定者\t日本分光",
+            "",
+            "[Detailed Information]",
+            "Created as\tNew Data",
+            "Data array type\tLinear data array",
+        ]
+    return (newline.join(lines) + newline).encode("shift_jis")
+
+
+def make_export_set(files, points, technique="IR", extended=True):
+    """Return [(file name, bytes), ...] for a set of exports."""
+    return [(f"sample{i:03d}.txt", make_export(points, technique, extended, seed=i)) for i in range(files)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("out_dir")
+    parser.add_argument("--files", type=int, default=20)
+    parser.add_argument("--points", type=int, default=7000)
+    parser.add_argument("--technique", choices=sorted(_TECHNIQUES), default="IR")
+    parser.add_argument("--no-extended", action="store_true", help="Extended Informationを付けない")
+    args = parser.parse_args()
+
+    os.makedirs(args.out_dir, exist_ok=True)
+    for name, data in make_export_set(args.files, args.points, args.technique, not args.no_extended):
+        with open(os.path.join(args.out_dir, name), "wb") as f:
+            f.write(data)
+
+
+if __name__ == "__main__":
+    main()
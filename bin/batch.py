@@ -0,0 +1,10 @@
+"""Format JASCO exports into Excel workbooks from the command line.
+
+    python bin/batch.py IR data/sample_a data/sample_b -o out --jobs 4
+"""
+import sys
+
+from jasco.cli import main
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,4 @@
+"""JASCO spectra formatter core (no Streamlit dependency)."""
+from .parser import Spectrum, iter_xy_chunks, parse_spectrum, read_spectrum
+
+__all__ = ["Spectrum", "iter_xy_chunks", "parse_spectrum", "read_spectrum"]
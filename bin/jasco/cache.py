@@ -0,0 +1,127 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from .parser import CHUNK_SIZE
+
+
+def content_key(data):
+    """Hash of the raw file bytes (bytes or a binary file-like object) used as the cache key."""
+    h = hashlib.blake2b(digest_size=16)
+    if hasattr(data, "read"):
+        # ファイルはチャンクごとにハッシュし、先頭に戻しておく
+        for raw in iter(lambda: data.read(CHUNK_SIZE), b""):
+            h.update(raw)
+        data.seek(0)
+    else:
+        h.update(data)
+    return h.hexdigest()
+
+
+def spectrum_nbytes(spectrum):
+    """Approximate memory held by a parsed spectrum."""
+    header = sum(len(k) + len(v) for k, v in spectrum.header.items())
+    return spectrum.x.nbytes + spectrum.y.nbytes + header
+
+
+class LRUStore:
+    """Thread-safe LRU store bounded by total size, with optional expiry.
+
+    One instance can be shared by every session of the Streamlit server.
+    Entries older than ttl seconds (None: never) are dropped on access.
+    """
+
+    def __init__(self, max_bytes=256 * 1024 * 1024, ttl=None, sizeof=len):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.sizeof = sizeof
+        self.nbytes = 0
+        self._entries = OrderedDict()  # key -> (value, nbytes, 登録時刻)
+        self._lock = threading.RLock()
+        self._pending = {}  # key -> 作成中のLock
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    def get(self, key):
+        """Return the value for key, or None on a miss or an expired entry."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if self._expired(entry):
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def put(self, key, value):
+        """Store value under key, evicting expired and least recently used entries if needed."""
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            nbytes = self.sizeof(value)
+            self._entries[key] = (value, nbytes, time.monotonic())
+            self.nbytes += nbytes
+            self._evict()
+
+    def get_or_create(self, key, create):
+        """Return the value for key, calling create() on a miss.
+
+        Concurrent callers with the same key wait for the first one instead of
+        repeating the work.
+        """
+        value = self.get(key)
+        if value is not None:
+            return value
+        with self._lock:
+            lock = self._pending.setdefault(key, threading.Lock())
+        try:
+            with lock:
+                value = self.get(key)
+                if value is None:
+                    value = create()
+                    self.put(key, value)
+        finally:
+            with self._lock:
+                self._pending.pop(key, None)
+        return value
+
+    def _expired(self, entry):
+        return self.ttl is not None and time.monotonic() - entry[2] > self.ttl
+
+    def _remove(self, key):
+        _, nbytes, _ = self._entries.pop(key)
+        self.nbytes -= nbytes
+
+    def _evict(self):
+        for key in [key for key, entry in self._entries.items() if self._expired(entry)]:
+            self._remove(key)
+        # 古いものから削除（直近の1件は残す）
+        while self.nbytes > self.max_bytes and len(self._entries) > 1:
+            self._remove(next(iter(self._entries)))
+
+
+class SpectrumCache(LRUStore):
+    """LRU cache of parsed spectra keyed on content hash, bounded by memory."""
+
+    def __init__(self, max_bytes=256 * 1024 * 1024, ttl=None):
+        super().__init__(max_bytes, ttl, spectrum_nbytes)
+
+    def get(self, key, name=None):
+        """Return the cached spectrum for key renamed to name, or None on a miss."""
+        spectrum = super().get(key)
+        if spectrum is None:
+            return None
+        # 同じ内容でもファイル名は異なる場合がある
+        return spectrum._replace(name=name)
+
+    def put(self, key, spectrum):
+        """Store a parsed spectrum under key; its arrays become read-only because they are shared."""
+        spectrum.x.flags.writeable = False
+        spectrum.y.flags.writeable = False
+        super().put(key, spectrum)
@@ -0,0 +1,146 @@
+"""Batch formatting of JASCO exports without Streamlit.
+
+Each DIR/GLOB argument is one sample set and becomes one workbook.
+"""
+import argparse
+import glob
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from .excel import write_wide_workbook, write_workbook
+from .npz import write_npz
+from .parser import read_spectrum
+from .profiles import PROFILES
+
+
+def is_export(filename):
+    """True for the file names taken from a sample set directory (.txt, any case)."""
+    return filename.lower().endswith(".txt")
+
+
+def collect_files(pattern):
+    """Expand a directory (its .txt files, see is_export) or glob pattern into a sorted list of files."""
+    if os.path.isdir(pattern):
+        paths = [os.path.join(pattern, name) for name in os.listdir(pattern) if is_export(name)]
+    else:
+        paths = glob.glob(pattern)
+    return sorted(path for path in paths if os.path.isfile(path))
+
+
+def batch_name(pattern):
+    """Name of the sample set: the directory name, or the glob without wildcards."""
+    if os.path.isdir(pattern):
+        return os.path.basename(os.path.normpath(pattern))
+    name = re.sub(r"[*?\[\]]", "", os.path.splitext(os.path.basename(pattern))[0])
+    return name or os.path.basename(os.path.dirname(os.path.abspath(pattern)))
+
+
+def build_batch(paths, technique, out_path, npz=False, step=None, display="formula"):
+    """Parse the files and write one workbook (and .npz).
+
+    Returns (number of files written, error messages, warnings); the number is 0
+    when nothing was written. With step set, the spectra are resampled onto one
+    X grid (0: automatic spacing). display is passed to the workbook writer
+    ("formula", "cached" or "value").
+    """
+    spectra = []
+    errors = []
+    for path in paths:
+        name = os.path.basename(path)
+        try:
+            with open(path, "rb") as f:
+                spectra.append(read_spectrum(f, name))
+        except ValueError as e:
+            errors.append(f"エラー: {name} - {str(e)}")
+    warnings = warning_messages(spectra)
+    if not spectra:
+        return 0, errors, warnings
+    try:
+        write_outputs(spectra, technique, out_path, npz, step, display)
+    except ValueError as e:
+        # Excelの行数の上限を超える場合など
+        errors.append(f"エラー: {os.path.basename(out_path)} - {str(e)}")
+        return 0, errors, warnings
+    return len(spectra), errors, warnings
+
+
+def warning_messages(spectra):
+    """Messages for what the parser repaired in each spectrum."""
+    return [f"注意: {s.name} - {w}" for s in spectra for w in s.warnings]
+
+
+def write_outputs(spectra, technique, out_path, npz=False, step=None, display="formula"):
+    """Write the workbook (and .npz) for parsed spectra; see build_batch for the options."""
+    if step is None:
+        data = write_workbook(spectra, PROFILES[technique], display=display)
+    else:
+        data = write_wide_workbook(spectra, PROFILES[technique], step or None, display=display)
+    # 書きかけのファイルを開かれないよう、一時ファイルに書いてから置き換える
+    tmp_path = out_path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, out_path)
+    if npz:
+        write_npz(spectra, os.path.splitext(out_path)[0] + ".npz", profile=PROFILES[technique])
+
+
+def add_output_arguments(parser):
+    """Options shared by the batch and watch commands."""
+    parser.add_argument("-o", "--output-dir", default=".", help="Excelファイルの出力先（既定: カレントディレクトリ）")
+    parser.add_argument("--npz", action="store_true", help="解析済みスペクトルを.npzでも出力する")
+    parser.add_argument("--wide", action="store_true", help="共通の横軸に補間して1つの表にする")
+    parser.add_argument("--step", type=float, default=0, help="--wide の横軸の間隔（既定: 自動）")
+    parser.add_argument("--display", choices=["formula", "cached", "value"], default="formula",
+                        help="グラフ用の列：計算式、計算結果付きの計算式、または値（既定: formula）")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("technique", choices=sorted(PROFILES), help="測定手法")
+    parser.add_argument("inputs", nargs="+", metavar="DIR/GLOB", help="txtファイルのディレクトリまたはglob")
+    add_output_arguments(parser)
+    parser.add_argument("-j", "--jobs", type=int, default=1, help="並列に処理するサンプルセットの数")
+    args = parser.parse_args(argv)
+
+    status = 0
+    batches = []
+    sources = {}  # 出力先 -> 入力（同じ名前のサンプルセットの上書きを防ぐ）
+    for pattern in args.inputs:
+        paths = collect_files(pattern)
+        if not paths:
+            print(f"エラー: {pattern} - txtファイルが見つかりません。", file=sys.stderr)
+            status = 1
+            continue
+        out_path = os.path.join(args.output_dir, f"{batch_name(pattern)}_{args.technique}.xlsx")
+        key = os.path.normcase(os.path.abspath(out_path))
+        if key in sources:
+            parser.error(f"{sources[key]} と {pattern} の出力先がどちらも {out_path} になります。"
+                         "別々に実行して --output-dir を分けてください。")
+        sources[key] = pattern
+        batches.append((paths, out_path))
+
+    os.makedirs(args.output_dir, exist_ok=True)
+
+    all_paths = [paths for paths, _ in batches]
+    out_paths = [out_path for _, out_path in batches]
+    techniques = [args.technique] * len(batches)
+    npz = [args.npz] * len(batches)
+    steps = [args.step if args.wide else None] * len(batches)
+    displays = [args.display] * len(batches)
+    # サンプルセットごとに独立しているので、--jobs 2以上ならプロセス並列で処理
+    if args.jobs > 1:
+        with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+            results = list(pool.map(build_batch, all_paths, techniques, out_paths, npz, steps, displays))
+    else:
+        results = list(map(build_batch, all_paths, techniques, out_paths, npz, steps, displays))
+
+    for out_path, (written, errors, warnings) in zip(out_paths, results):
+        for message in errors + warnings:
+            print(message, file=sys.stderr)
+        if written:
+            print(f"{out_path} ({written} files)")
+        else:
+            status = 1
+    return status
@@ -0,0 +1,310 @@
+import io
+import os
+
+import numpy as np
+
+from .profiles import axis_range, overlay_offsets
+from .profiling import NULL_PROFILER
+from .resample import common_grid, resample
+
+# 軸の共通書式
+_AXIS_LINE = {'color': 'black', 'width': 1.5}
+_NUM_FONT = {'color': 'black', 'size': 16, 'name': 'Arial'}
+_NAME_FONT = {'color': 'black', 'size': 16, 'name': 'Arial', 'bold': False}
+
+# Excelのワークシートの行数の上限（1・2行目はファイル名・項目名なので、データは3行目から）
+EXCEL_MAX_ROWS = 1048576
+MAX_DATA_ROWS = EXCEL_MAX_ROWS - 2
+
+# display="value" のときA1に書く説明
+RECOMPUTE_NOTE = ("グラフ用の列は計算済みの値です。倍率（1行目）や補正定数（2行目）を変えたら、"
+                  "その列の3行目のセルのフィルハンドルをダブルクリックして再計算してください。")
+
+
+# Excel列ずらし対応
+def col_num_to_excel_col(n):
+    """Convert a 0-based column number to Excel-style column label (e.g., 0 -> 'A', 27 -> 'AB')"""
+    result = ""
+    while n >= 0:
+        result = chr(n % 26 + 65) + result
+        n = n // 26 - 1
+    return result
+
+
+def _set_chart_axes(chart, spectra, profile):
+    xmin, xmax, ymin, ymax = axis_range(spectra, profile)
+    chart.set_x_axis({
+        'line': _AXIS_LINE,
+        'major_tick_mark': 'inside',
+        'major_unit': profile.x_major_unit,
+        'min': xmin,
+        'max': xmax,
+        'reverse': profile.x_reverse,
+        'name': profile.x_title,
+        'num_font': _NUM_FONT,
+        'name_font': _NAME_FONT,
+        **profile.chart_x_axis,
+    })
+    chart.set_y_axis({
+        'line': _AXIS_LINE,
+        'max': ymax,
+        'min': ymin,
+        'name': profile.y_title,
+        'major_gridlines': {'visible': False},
+        'num_font': _NUM_FONT,
+        'name_font': _NAME_FONT,
+        **profile.chart_y_axis,
+    })
+    chart.set_size({'width': 460, 'height': 370 + profile.chart_height_per_file * len(spectra)})
+
+
+def _new_workbook(output):
+    # xlsxwriterはExcelを作るときだけ読み込む（ページ・CLIの起動を速くするため）
+    import xlsxwriter
+
+    # constant_memory：行ごとにディスクへ書き出してメモリを抑える（上の行から順に書き込む必要あり）
+    return xlsxwriter.Workbook(output, {'constant_memory': True})
+
+
+def _cell_formats(workbook):
+    # フォント設定用のフォーマットを作成
+    cell_format = workbook.add_format({'font_name': 'Times New Roman', 'font_size': 11})
+    border_format = workbook.add_format({'font_name': 'Times New Roman', 'font_size': 11, 'border': 1})
+    filename_format = workbook.add_format({'font_color': 'blue', 'font_name': 'Times New Roman', 'font_size': 11})
+    return cell_format, border_format, filename_format
+
+
+def _filled_runs(filled):
+    # Trueが続く区間の (開始, 終了) のリスト
+    edges = np.flatnonzero(np.diff(np.concatenate(([False], filled, [False])).astype(np.int8)))
+    return list(zip(edges[::2], edges[1::2]))
+
+
+def _write_rows(worksheet, table, start_col, cell_format, formula_cells=None):
+    # 3行目以降を1行分まとめて書き込む（constant_memoryなので上の行から順に）
+    # None のセル（ブロック間の空き列、短いファイルの下の余り）は書かない
+    # formula_cells：行 -> [(列, 計算式, 計算結果)]。計算結果付きで個別に書き込む
+    formula_cells = formula_cells or {}
+    filled = np.not_equal(table, None)
+    pattern = None
+    for i, row in enumerate(table):
+        # 埋まっている区間は行が変わってもほとんど同じなので、変わったときだけ求め直す
+        if pattern is None or not np.array_equal(filled[i], pattern):
+            pattern = filled[i]
+            runs = _filled_runs(pattern)
+        worksheet.set_row(i + 2, 20, cell_format)
+        for a, b in runs:
+            worksheet.write_row(i + 2, start_col + a, row[a:b], cell_format)
+        for col, formula, value in formula_cells.get(i, ()):
+            worksheet.write_formula(i + 2, start_col + col, formula, cell_format, value)
+
+
+def _display_column(table, formula_cells, col, rows, values, formulas, display):
+    """Fill one display column (Y * scale + offset) of table for the given display mode.
+
+    "formula": a formula per row. "cached": the same formulas with their results
+    stored, so viewers that do not recalculate still show the data. "value": the
+    precomputed numbers, with the formula kept only in the first data row.
+    """
+    if display == "formula":
+        table[rows, col] = formulas
+    elif display == "cached":
+        for i, formula, value in zip(rows, formulas, values):
+            formula_cells.setdefault(i, []).append((col, formula, value))
+    else:
+        table[rows, col] = values
+        # 倍率・補正定数を変えたときの再計算用（3行目のセルのフィルハンドルをダブルクリック）
+        if formulas:
+            seed = values[0] if len(rows) and rows[0] == 0 else "#N/A"
+            formula_cells.setdefault(0, []).append((col, formulas[0], seed))
+
+
+def _write_recompute_note(worksheet, display):
+    if display == "value":
+        worksheet.write(0, 0, RECOMPUTE_NOTE)
+
+
+def _insert_chart(workbook, worksheet, series, spectra, profile):
+    """Add the formatted scatter chart; series is a list of (name, categories, values) references."""
+    # Excelグラフの初期設定
+    chart = workbook.add_chart({'type': 'scatter', 'subtype': 'smooth'})
+    chart.set_chartarea({'border': {'none': True}, 'fill': {'none': True}})
+    chart.set_plotarea({'border': {'color': 'black', 'width': 1.5}, 'fill': {'none': True}})
+    chart.set_legend({'none': True})
+    chart.set_title({'none': True})
+
+    for name, categories, values in series:
+        chart.add_series({
+            'categories': categories,
+            'values': values,
+            'name': name,
+            'marker': {'type': 'none'},
+            'line': {'color': '#008EC0', 'width': 1.5},
+        })
+
+    # Excelグラフ書式修正
+    _set_chart_axes(chart, spectra, profile)
+    worksheet.insert_chart("A4", chart)
+
+
+def _column_ref(col, first_row, last_row):
+    # stlite対応の文字列操作
+    col = col_num_to_excel_col(col)
+    return "=Data!$" + col + "$" + str(first_row) + ":$" + col + "$" + str(last_row)
+
+
+def check_rows(spectra, step=None):
+    """Raise ValueError if the data does not fit in one worksheet.
+
+    step is None for write_workbook (one block per file), or the grid spacing
+    of write_wide_workbook (0: automatic). xlsxwriter would silently drop the
+    rows beyond the limit, leaving the chart pointing past the end of the sheet.
+    """
+    if step is None:
+        for spectrum in spectra:
+            if len(spectrum.x) > MAX_DATA_ROWS:
+                raise ValueError(f"{spectrum.name}の点数（{len(spectrum.x)}点）が"
+                                 f"Excelの行数の上限（{MAX_DATA_ROWS}点）を超えています。")
+    else:
+        common_grid(spectra, step or None, MAX_DATA_ROWS)
+
+
+def write_workbook(spectra, profile, profiler=NULL_PROFILER, display="formula"):
+    """Build the formatted workbook for parsed spectra and return its bytes.
+
+    display selects how the chart columns are written; see _display_column.
+    Raises ValueError if a file has more points than a worksheet has rows.
+    """
+    check_rows(spectra)
+    num_files = len(spectra)
+    offsets = overlay_offsets(num_files, profile)
+    max_len = max((len(s.x) for s in spectra), default=0)
+    start_col = 11  # 初期列（L列 = インデックス11）
+
+    output = io.BytesIO()
+    workbook = _new_workbook(output)
+    worksheet = workbook.add_worksheet("Data")
+    cell_format, border_format, filename_format = _cell_formats(workbook)
+
+    with profiler.stage("excel.cells", files=num_files, rows=max_len):
+        # 1行目：ファイル名と倍率
+        worksheet.set_row(0, 20, cell_format)
+        _write_recompute_note(worksheet, display)
+        for k, spectrum in enumerate(spectra):
+            worksheet.write(0, start_col + 4 * k, spectrum.name, filename_format)
+            worksheet.write(0, start_col + 4 * k + 2, 1, border_format)
+
+        # 2行目：項目名と補正定数
+        worksheet.set_row(1, 20, cell_format)
+        for k in range(num_files):
+            worksheet.write_row(1, start_col + 4 * k, [profile.x_header, profile.y_header], cell_format)
+            worksheet.write(1, start_col + 4 * k + 2, offsets[k], border_format)
+
+        # 3行目以降：X, Y, グラフ表示用Y（計算式または値）
+        table = np.full((max_len, max(4 * num_files - 1, 0)), None, dtype=object)
+        formula_cells = {}
+        for k, spectrum in enumerate(spectra):
+            n = len(spectrum.x)
+            # stlite対応の文字列操作
+            col1 = col_num_to_excel_col(start_col + 4 * k + 1)
+            col2 = col_num_to_excel_col(start_col + 4 * k + 2)
+            table[:n, 4 * k] = spectrum.x
+            table[:n, 4 * k + 1] = spectrum.y
+            # 値のみのときは先頭行の式だけ作る
+            formula_rows = range(min(1, n) if display == "value" else n)
+            formulas = ["=" + col1 + str(i + 3) + "*$" + col2 + "$1+$" + col2 + "$2" for i in formula_rows]
+            # 倍率は1なので、表示用の値はY＋補正定数
+            _display_column(table, formula_cells, 4 * k + 2, np.arange(n),
+                            spectrum.y + offsets[k], formulas, display)
+        _write_rows(worksheet, table, start_col, cell_format, formula_cells)
+
+    with profiler.stage("excel.chart"):
+        # Excelにプロット追加（ファイル名から拡張子を除去）
+        series = [
+            (
+                os.path.splitext(spectrum.name)[0],
+                _column_ref(start_col + 4 * k, 3, len(spectrum.x) + 2),
+                _column_ref(start_col + 4 * k + 2, 3, len(spectrum.x) + 2),
+            )
+            for k, spectrum in enumerate(spectra)
+        ]
+        _insert_chart(workbook, worksheet, series, spectra, profile)
+
+    # xlsxファイルの組み立て
+    with profiler.stage("excel.close"):
+        workbook.close()
+
+    return output.getvalue()
+
+
+def write_wide_workbook(spectra, profile, step=None, profiler=NULL_PROFILER, display="formula"):
+    """Workbook with all spectra resampled onto one X grid: one X column, one Y column per file.
+
+    step is the grid spacing in X units (None: the finest spacing among the files).
+    Each file also gets a display column (Y * scale + offset) used by the chart,
+    with the scale and offset in its first two rows as in write_workbook;
+    display is handled the same way. Raises ValueError if the grid has more
+    points than a worksheet has rows.
+    """
+    num_files = len(spectra)
+    offsets = overlay_offsets(num_files, profile)
+    start_col = 11  # 初期列（L列 = インデックス11）
+    display_col = start_col + num_files + 2  # Y列の後に1列空ける
+
+    with profiler.stage("resample", files=num_files) as info:
+        grid = common_grid(spectra, step, MAX_DATA_ROWS)
+        table_y = resample(spectra, grid)
+        info["rows"] = len(grid)
+
+    output = io.BytesIO()
+    workbook = _new_workbook(output)
+    worksheet = workbook.add_worksheet("Data")
+    cell_format, border_format, filename_format = _cell_formats(workbook)
+
+    with profiler.stage("excel.cells", files=num_files, rows=len(grid)):
+        # 1行目：ファイル名と倍率
+        worksheet.set_row(0, 20, cell_format)
+        _write_recompute_note(worksheet, display)
+        for k, spectrum in enumerate(spectra):
+            worksheet.write(0, start_col + 1 + k, spectrum.name, filename_format)
+        for k in range(num_files):
+            worksheet.write(0, display_col + k, 1, border_format)
+
+        # 2行目：項目名と補正定数
+        worksheet.set_row(1, 20, cell_format)
+        worksheet.write_row(1, start_col, [profile.x_header] + [profile.y_header] * num_files, cell_format)
+        for k in range(num_files):
+            worksheet.write(1, display_col + k, offsets[k], border_format)
+
+        # 3行目以降：X, 各ファイルのY, グラフ表示用Y（計算式または値）
+        # 範囲外（NaN）は空欄のままにして、グラフでは途切れさせる
+        table = np.full((len(grid), display_col + num_files - start_col), None, dtype=object)
+        table[:, 0] = grid
+        formula_cells = {}
+        for k in range(num_files):
+            valid = np.flatnonzero(~np.isnan(table_y[k]))
+            col1 = col_num_to_excel_col(start_col + 1 + k)
+            col2 = col_num_to_excel_col(display_col + k)
+            table[valid, 1 + k] = table_y[k, valid]
+            if display == "value":
+                # 再計算用の3行目の式：フィルで範囲外の行に広げても #N/A（グラフでは途切れる）になる
+                formulas = ["=IF(ISNUMBER(" + col1 + "3)," + col1 + "3*$" + col2 + "$1+$" + col2 + "$2,NA())"]
+            else:
+                formulas = ["=" + col1 + str(i + 3) + "*$" + col2 + "$1+$" + col2 + "$2" for i in valid]
+            # 倍率は1なので、表示用の値はY＋補正定数
+            values = table_y[k, valid] + offsets[k]
+            _display_column(table, formula_cells, display_col - start_col + k, valid, values, formulas, display)
+        _write_rows(worksheet, table, start_col, cell_format, formula_cells)
+
+    with profiler.stage("excel.chart"):
+        categories = _column_ref(start_col, 3, len(grid) + 2)
+        series = [
+            (os.path.splitext(spectrum.name)[0], categories, _column_ref(display_col + k, 3, len(grid) + 2))
+            for k, spectrum in enumerate(spectra)
+        ]
+        _insert_chart(workbook, worksheet, series, spectra, profile)
+
+    with profiler.stage("excel.close"):
+        workbook.close()
+
+    return output.getvalue()
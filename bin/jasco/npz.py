@@ -0,0 +1,79 @@
+"""Compact binary (.npz) export of parsed spectra.
+
+All spectra are stored in one uncompressed .npz: X and Y concatenated into
+two flat arrays, the start offset of each spectrum, the file names and the
+headers as JSON. Because the members are stored uncompressed, load_npz can
+memory-map the numeric arrays instead of reading them.
+"""
+import json
+import os
+import struct
+import zipfile
+
+import numpy as np
+
+from .parser import Spectrum
+
+
+def write_npz(spectra, file, dtype=np.float64, profile=None):
+    """Write spectra to file (path or binary file-like) as .npz."""
+    lengths = [len(s.x) for s in spectra]
+    offsets = np.zeros(len(spectra) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+    np.savez(
+        file,
+        x=np.concatenate([s.x for s in spectra]).astype(dtype) if spectra else np.zeros(0, dtype),
+        y=np.concatenate([s.y for s in spectra]).astype(dtype) if spectra else np.zeros(0, dtype),
+        offsets=offsets,
+        names=np.array([s.name or "" for s in spectra], dtype=str),
+        headers=np.array([json.dumps(s.header, ensure_ascii=False) for s in spectra], dtype=str),
+        profile=np.array(profile.name if profile is not None else ""),
+    )
+
+
+def _mmap_member(path, zf, member):
+    # 無圧縮で格納された .npy のデータ部分を直接メモリマップする
+    info = zf.getinfo(member + ".npy")
+    if info.compress_type != zipfile.ZIP_STORED:
+        return None
+    with open(path, "rb") as f:
+        f.seek(info.header_offset + 26)
+        name_len, extra_len = struct.unpack("<HH", f.read(4))
+        f.seek(info.header_offset + 30 + name_len + extra_len)
+        version = np.lib.format.read_magic(f)
+        if version == (1, 0):
+            shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+        else:
+            shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+        offset = f.tell()
+    if shape == (0,):
+        return np.zeros(0, dtype)
+    return np.memmap(path, dtype=dtype, mode="r", offset=offset, shape=shape,
+                     order="F" if fortran_order else "C")
+
+
+def load_npz(file, mmap=True):
+    """Load spectra written by write_npz; returns (spectra, profile_name).
+
+    When file is a path and mmap is true, X and Y are read-only views into a
+    memory map, so nothing is read until the arrays are used.
+    """
+    with np.load(file, allow_pickle=False) as data:
+        offsets = data["offsets"]
+        names = data["names"].tolist()
+        headers = [json.loads(h) for h in data["headers"].tolist()]
+        profile = str(data["profile"])
+        x = y = None
+        if mmap and isinstance(file, (str, os.PathLike)):
+            file = os.fspath(file)
+            with zipfile.ZipFile(file) as zf:
+                x = _mmap_member(file, zf, "x")
+                y = _mmap_member(file, zf, "y")
+        if x is None or y is None:
+            x = data["x"]
+            y = data["y"]
+    spectra = [
+        Spectrum(name or None, header, x[start:end], y[start:end])
+        for name, header, start, end in zip(names, headers, offsets[:-1], offsets[1:])
+    ]
+    return spectra, profile
@@ -0,0 +1,90 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+from .parser import parse_spectrum, read_spectrum
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _parse(data, name):
+    # ValueErrorはそのまま返し、呼び出し側でファイルごとに報告する
+    try:
+        return parse_spectrum(data, name)
+    except ValueError as e:
+        return e
+
+
+def _parse_local(source, name):
+    # このプロセスで解析する：ファイルは丸ごと読まずにストリームで読む
+    if not hasattr(source, "read"):
+        return _parse(source, name)
+    source.seek(0)
+    try:
+        return read_spectrum(source, name)
+    except ValueError as e:
+        return e
+
+
+def _payload(source):
+    # ワーカーに送るバイト列（送る直前に1ファイル分だけ作る）
+    if not hasattr(source, "read"):
+        return source
+    source.seek(0)
+    return source.read()
+
+
+def get_executor(max_workers=None):
+    """Process pool shared by all callers; created on first use."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            # Streamlitはスレッドで動くため、forkではなくspawnでワーカーを起動する
+            _executor = ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn"))
+        return _executor
+
+
+def _discard_executor(executor):
+    # 壊れたプールを捨て、次の呼び出しで作り直す（他の呼び出しがすでに作り直していれば何もしない）
+    global _executor
+    with _executor_lock:
+        if _executor is executor:
+            _executor = None
+    executor.shutdown(wait=False, cancel_futures=True)
+
+
+def parse_many(items, max_workers=None):
+    """Parse (source, name) pairs in parallel; source is bytes or a binary file-like object.
+
+    Returns one Spectrum or ValueError per item, in the order of items.
+    Only about one file per worker is read into memory and sent at a time.
+    Falls back to parsing in-process (streaming file-like sources) for a
+    single item or a single core, and when a worker process died (the pool is
+    then rebuilt on the next call).
+    """
+    workers = max_workers or os.cpu_count() or 1
+    if workers <= 1 or len(items) <= 1:
+        return [_parse_local(source, name) for source, name in items]
+    executor = get_executor(workers)
+    results = [None] * len(items)
+    pending = {}  # future -> 項目の番号
+    submitted = 0
+    try:
+        while submitted < len(items) or pending:
+            # 処理中のファイルがワーカーの数を超えないように、終わった分だけ送る
+            while submitted < len(items) and len(pending) < workers:
+                source, name = items[submitted]
+                pending[executor.submit(_parse, _payload(source), name)] = submitted
+                submitted += 1
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                results[pending.pop(future)] = future.result()
+    except (BrokenProcessPool, RuntimeError):
+        # メモリ不足などでワーカーが落ちると、このプールは以後すべての呼び出しで失敗する
+        # （RuntimeError：別のセッションがすでに壊れたプールを閉じていた）
+        _discard_executor(executor)
+        results = [result if result is not None else _parse_local(*item) for result, item in zip(results, items)]
+    return results
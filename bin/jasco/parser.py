@@ -0,0 +1,281 @@
+import codecs
+import io
+import re
+from collections import namedtuple
+
+import numpy as np
+
+# 解析済みスペクトル（x, y は float64 の1次元配列、warnings は読み取り時に修正した内容）
+Spectrum = namedtuple("Spectrum", ["name", "header", "x", "y", "warnings"], defaults=((),))
+
+# ヘッダーから読み取った情報（NPOINTSは、ない・読めない場合 None）
+Layout = namedtuple("Layout", ["header", "encoding", "data_offset", "npoints"])
+
+# XYDATA行を探す範囲（先頭からのバイト数・文字数）。この中になければJASCOのファイルではないとみなす
+HEADER_LIMIT = 64 * 1024
+
+# "XYDATA" だけの行（CRLF対応）
+_XYDATA_LINE = re.compile(rb"^XYDATA\r?$", re.M)
+# データブロックの終端：空行 または '##### Extended Information' の行
+# （改行から始めると、reが改行だけを高速に探してから残りを照合するので数倍速い）
+_BLOCK_END = re.compile(rb"\n(?:[ \t\r]*(?:\n|$)|##### Extended Information)")
+# データブロックの最初の行
+_FIRST_LINE = re.compile(rb"\S[^\n]*")
+
+
+def detect_encoding(prefix):
+    """Guess the encoding of an export from its first bytes: a BOM, UTF-8, or else cp932."""
+    if prefix.startswith(codecs.BOM_UTF8):
+        return "utf-8-sig"
+    if prefix.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+        return "utf-16"
+    try:
+        # 途中で切れた文字は無視できるよう、インクリメンタルデコーダーで確かめる
+        text = codecs.getincrementaldecoder("utf-8")().decode(prefix)
+    except UnicodeDecodeError:
+        # Windows版Spectra Managerの既定（Shift_JISにMicrosoftの拡張文字を加えたもの）
+        return "cp932"
+    return "cp932" if text.isascii() else "utf-8"
+
+
+# ヘッダーを判定した文字コードで読めないときのエラー
+_HEADER_ENCODING_ERROR = "ヘッダーの文字コードを判別できません。"
+
+
+def _add_header_line(header, line):
+    key, _, value = line.partition("\t")
+    if key.strip():
+        header[key.strip()] = value.strip()
+
+
+def _parse_header(raw, encoding="cp932"):
+    """Decode the header part (before XYDATA) into a {key: value} dict."""
+    header = {}
+    try:
+        text = raw.decode(encoding)
+    except UnicodeDecodeError:
+        raise ValueError(_HEADER_ENCODING_ERROR) from None
+    for line in text.splitlines():
+        _add_header_line(header, line)
+    return header
+
+
+def _number(header, key, type=float):
+    try:
+        return type(float(header[key]))
+    except (KeyError, ValueError):
+        return None
+
+
+def header_layout(header, encoding="cp932", data_offset=None):
+    """Layout from a parsed header."""
+    return Layout(header, encoding, data_offset, _number(header, "NPOINTS", int))
+
+
+def read_layout(prefix):
+    """Find XYDATA within the first HEADER_LIMIT bytes and read the header before it."""
+    encoding = detect_encoding(prefix)
+    m = _XYDATA_LINE.search(prefix, 0, HEADER_LIMIT)
+    if m is None:
+        raise ValueError("日本分光のスペクトルファイルではないようです。")
+    header = _parse_header(prefix[:m.start()], encoding)
+    # XYDATA行の次の行から
+    return header_layout(header, encoding, m.end() + 1)
+
+
+def block_end(data, start):
+    """End offset of the XYDATA block starting at start: the first blank line or the trailer."""
+    # 最初の空行（またはExtended Information）の手前まで、なければ最終行まで
+    # start の直前の改行から探す（先頭行が空行の場合も見つける）
+    end_match = _BLOCK_END.search(data, start - 1)
+    end = end_match.start() + 1 if end_match is not None else len(data)
+    return max(start, end)
+
+
+def _check_block(block):
+    # Excelを作る前に、空のブロックや列数の違いをここで弾く
+    first = _FIRST_LINE.search(block)
+    if first is None:
+        raise ValueError("XYDATAが空です。")
+    if len(first.group().split()) != 2:
+        raise ValueError("XYDATAの列数が2ではありません。")
+
+
+def _load(block):
+    # block はバイト列またはテキスト。numpyのエラーは分かりやすい文言に置き換える
+    stream = io.BytesIO(block) if isinstance(block, bytes) else io.StringIO(block)
+    try:
+        return np.loadtxt(stream, dtype=np.float64, ndmin=2)
+    except ValueError as e:
+        if "number of columns" in str(e):
+            raise ValueError("XYDATAの列数が2ではありません。") from None
+        raise ValueError(f"XYDATAに数値として読めない行があります。（{e}）") from None
+
+
+def validate(name, header, x, y, npoints=None):
+    """Return a Spectrum after repairing what can be repaired (listed in its warnings)."""
+    warnings = []
+    if npoints is not None and npoints != len(y):
+        warnings.append(f"ヘッダーのNPOINTS（{npoints}）と実際の点数（{len(y)}）が異なります。実際の点数を使います。")
+    finite = np.isfinite(x) & np.isfinite(y)
+    if not finite.all():
+        # NaNや無限大はExcelに書き込めないので除く
+        warnings.append(f"数値でない点（{int(np.count_nonzero(~finite))}点）を除きました。")
+        x, y = x[finite], y[finite]
+        if not len(y):
+            raise ValueError("XYDATAに有効な点がありません。")
+    return Spectrum(name, header, x, y, tuple(warnings))
+
+
+def parse_spectrum(data, name=None):
+    """Parse the raw bytes of a JASCO text export into a Spectrum.
+
+    The header is read from a bounded prefix, and the numeric block is handed
+    to numpy's C reader.
+    """
+    if detect_encoding(data[:2]) == "utf-16":
+        # UTF-16のままでは行をバイト列で探せないので、UTF-8に直してから読む
+        data = data.decode("utf-16").encode("utf-8")
+    layout = read_layout(data[:HEADER_LIMIT])
+    start = layout.data_offset
+    end = block_end(data, start)
+    block = data[start:end]
+    _check_block(block)
+    xy = _load(block)
+    if xy.shape[1] != 2:
+        raise ValueError("XYDATAの列数が2ではありません。")
+    return validate(name, layout.header, xy[:, 0].copy(), xy[:, 1].copy(), layout.npoints)
+
+
+# ストリーム読み取り時の1回あたりの読み込みバイト数
+CHUNK_SIZE = 256 * 1024
+# NPOINTSから先に確保する点数の上限
+MAX_PRESIZE = 4 * 1024 * 1024
+
+# 完結した行のみを対象にする終端判定（空行は改行まで含めて判定）
+# 行頭で判定するものと、改行から探すもの（_BLOCK_END と同じ理由）
+_TEXT_BLOCK_END_LINE = re.compile(r"[ \t\r]*\n|##### Extended Information")
+_TEXT_BLOCK_END = re.compile(r"\n(?:[ \t\r]*\n|##### Extended Information)")
+
+
+def iter_text(stream, chunk_size=CHUNK_SIZE, encoding=None, errors="strict"):
+    """Decode a binary stream incrementally, yielding text one chunk at a time.
+
+    Without encoding, it is detected from the first HEADER_LIMIT bytes, as in
+    parse_spectrum (see detect_encoding); those are read before decoding starts.
+    """
+    # チャンクが小さくても、判定には先頭HEADER_LIMITバイトをまとめて使う
+    raw = b""
+    while len(raw) < HEADER_LIMIT:
+        more = stream.read(chunk_size)
+        if not more:
+            break
+        raw += more
+    decoder = codecs.getincrementaldecoder(encoding or detect_encoding(raw[:HEADER_LIMIT]))(errors)
+    while raw:
+        yield decoder.decode(raw)
+        raw = stream.read(chunk_size)
+    tail = decoder.decode(b"", final=True)
+    if tail:
+        yield tail
+
+
+def iter_xy_chunks(stream, header=None, chunk_size=CHUNK_SIZE):
+    """Yield the XYDATA block of a JASCO export as float64 (n, 2) arrays, chunk by chunk.
+
+    Only one decoded chunk is held at a time. Header entries are stored in
+    header (a dict) if given, and reading stops at the end of the block.
+    Like parse_spectrum, only the header has to be valid in the detected
+    encoding; text after the block (Extended Information) is not checked.
+    """
+    # チャンクにはデータ部の後ろ（Extended Information）も含まれるので、置換しながら読み、
+    # 文字コードの誤りはヘッダーの行だけで判定する
+    chunks = iter_text(stream, chunk_size, errors="replace")
+    pending = ""
+    found = False
+    unreadable = False
+    consumed = 0
+    # ヘッダー部：XYDATA行まで1行ずつ読む（HEADER_LIMIT文字を超えたらあきらめる）
+    for text in chunks:
+        pending += text
+        consumed += len(text)
+        start = 0
+        while not found:
+            newline = pending.find("\n", start)
+            if newline < 0:
+                break
+            line = pending[start:newline].rstrip("\r")
+            start = newline + 1
+            if "\ufffd" in line:
+                unreadable = True
+            if line == "XYDATA":
+                found = True
+            elif header is not None:
+                _add_header_line(header, line)
+        pending = pending[start:]
+        if found or consumed - len(pending) > HEADER_LIMIT:
+            break
+    if not found:
+        raise ValueError("日本分光のスペクトルファイルではないようです。")
+    if unreadable:
+        raise ValueError(_HEADER_ENCODING_ERROR)
+
+    # データ部：完結した行ごとにまとめて数値化し、終端で読み取りをやめる
+    empty = True
+    while True:
+        text = next(chunks, None)
+        if text is None:
+            pending += "\n"
+        else:
+            pending += text
+        cut = pending.rfind("\n") + 1
+        end = _TEXT_BLOCK_END_LINE.match(pending, 0, cut)
+        if end is not None:
+            cut = 0
+        else:
+            end = _TEXT_BLOCK_END.search(pending, 0, cut)
+            if end is not None:
+                cut = end.start() + 1
+        if pending[:cut].strip():
+            empty = False
+            xy = _load(pending[:cut])
+            if xy.shape[1] != 2:
+                raise ValueError("XYDATAの列数が2ではありません。")
+            yield xy
+        if end is not None or text is None:
+            break
+        pending = pending[cut:]
+    if empty:
+        raise ValueError("XYDATAが空です。")
+
+
+def _grow(a, n, size):
+    b = np.empty(size)
+    b[:n] = a[:n]
+    return b
+
+
+def read_spectrum(stream, name=None, chunk_size=CHUNK_SIZE):
+    """Parse a JASCO export from a binary file-like object without reading it whole.
+
+    The arrays are allocated once from NPOINTS; they grow only if the file
+    holds more points than its header says.
+    """
+    header = {}
+    x = y = None
+    n = 0
+    for xy in iter_xy_chunks(stream, header, chunk_size):
+        if x is None:
+            # 壊れたヘッダーで巨大な配列を確保しないよう上限を設ける
+            size = max(min(header_layout(header).npoints or 0, MAX_PRESIZE), len(xy))
+            x, y = np.empty(size), np.empty(size)
+        if n + len(xy) > len(x):
+            size = max(2 * len(x), n + len(xy))
+            x, y = _grow(x, n, size), _grow(y, n, size)
+        x[n:n + len(xy)] = xy[:, 0]
+        y[n:n + len(xy)] = xy[:, 1]
+        n += len(xy)
+    if n < len(x):
+        # NPOINTSより少なかった分のメモリを手放す
+        x, y = x[:n].copy(), y[:n].copy()
+    return validate(name, header, x, y, header_layout(header).npoints)
@@ -0,0 +1,33 @@
+from .preview import DEFAULT_PREVIEW_POINTS, minmax_decimate
+from .profiles import axis_range, overlay_offsets
+
+
+def new_figure(profile):
+    """Create the (fig, ax) pair for the preview plot."""
+    # matplotlibは静止画のプレビューを描くときだけ読み込む（読み込みに0.5秒ほどかかる）
+    # pyplotを通さないので、再実行のたびに図がpyplotに溜まることもない
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=profile.figsize)
+    return fig, fig.subplots()
+
+
+def draw_preview(ax, spectra, profile, max_points=DEFAULT_PREVIEW_POINTS):
+    """Plot the spectra into ax with the profile's stacking and axis conventions."""
+    # 表示用グラフにプロットを追加：先に処理したものを上へずらす
+    # 描画を軽くするため、ピーク形状を保ったまま点数を間引く
+    for spectrum, overlayconst in zip(spectra, overlay_offsets(len(spectra), profile)):
+        x, y = minmax_decimate(spectrum.x, spectrum.y, max_points)
+        ax.plot(x, y + overlayconst, label=spectrum.name, linewidth=1.5)
+
+    # 表示用グラフの装飾
+    xmin, xmax, ymin, ymax = axis_range(spectra, profile)
+    ax.set_xlabel(profile.x_plot_title, fontsize=12)
+    ax.set_ylabel(profile.y_title, fontsize=12)
+    ax.set_xlim(xmin, xmax)
+    if profile.preview_ylim:
+        ax.set_ylim(ymin, ymax)
+    ax.legend(loc=profile.legend_loc, fontsize=10)
+    ax.grid(True)
+    if profile.x_reverse:
+        ax.invert_xaxis()
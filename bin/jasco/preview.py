@@ -0,0 +1,51 @@
+import numpy as np
+
+# st.pyplot は dpi=200 で描画するので、幅8インチの図は約1600ピクセル。
+# 1ピクセル列あたり最小・最大の2点を残す。
+DEFAULT_PREVIEW_POINTS = 3200
+
+# インタラクティブ表示でブラウザへ送る全ファイル合計の点数の上限
+INTERACTIVE_TOTAL_POINTS = 60000
+
+
+def minmax_decimate(x, y, max_points=DEFAULT_PREVIEW_POINTS):
+    """Reduce a trace to about max_points by keeping the min and max of each bucket.
+
+    Peaks and dips survive because every bucket keeps its extreme values, in
+    their original order. Traces that already fit are returned unchanged.
+    """
+    n = len(y)
+    buckets = max(max_points // 2, 1)
+    if n <= max_points or n <= 2:
+        return x, y
+    size = -(-n // buckets)  # 切り上げ
+    buckets = -(-n // size)
+    # 最後のバケツの不足分はNaNで埋めて (buckets, size) に整形
+    padded = np.full(buckets * size, np.nan)
+    padded[:n] = y
+    padded = padded.reshape(buckets, size)
+    offsets = np.arange(buckets) * size
+    lo = np.nanargmin(padded, axis=1) + offsets
+    hi = np.nanargmax(padded, axis=1) + offsets
+    # 両端の点も残し、元の順序に並べ直す
+    idx = np.unique(np.concatenate(([0, n - 1], lo, hi)))
+    return x[idx], y[idx]
+
+
+def window_decimate(x, y, lo, hi, max_points=DEFAULT_PREVIEW_POINTS):
+    """Decimate only the part of a trace inside lo <= x <= hi.
+
+    One point beyond each edge is kept so the line reaches the border of the
+    visible range. Zooming in therefore shows more detail for the same budget.
+    """
+    idx = np.flatnonzero((x >= lo) & (x <= hi))
+    if not idx.size:
+        return x[:0], y[:0]
+    start = max(idx[0] - 1, 0)
+    stop = min(idx[-1] + 2, len(x))
+    return minmax_decimate(x[start:stop], y[start:stop], max_points)
+
+
+def points_per_trace(num_traces, max_points=DEFAULT_PREVIEW_POINTS, total=INTERACTIVE_TOTAL_POINTS):
+    """Per-trace point budget so that all traces together stay within total."""
+    return max(min(max_points, total // max(num_traces, 1)), 200)
@@ -0,0 +1,119 @@
+import math
+from collections import namedtuple
+
+import numpy as np
+
+# 測定手法ごとの設定。Excel・プレビュー・ページ表示はすべてここを参照する
+Profile = namedtuple("Profile", [
+    "name",                   # 手法名（ファイル名・タイトルに使用）
+    "export_hint",            # ページの手順1の説明
+    "x_header", "y_header",   # Excelの項目名
+    "x_title", "y_title",     # グラフの軸タイトル
+    "x_plot_title",           # プレビューの横軸タイトル（mathtext可）
+    "x_web_title",            # インタラクティブ表示の横軸タイトル（mathtext不可）
+    "x_range",                # 横軸の範囲 (min, max)
+    "extend_x",               # データが範囲を超えたら横軸の最大値を広げる
+    "x_major_unit",           # Excelグラフの横軸目盛間隔
+    "x_reverse",              # 横軸を反転する（IRの波数）
+    "stack",                  # 重ね書き時のずらし幅（先に処理したものを上へ）
+    "y_range",                # spectra -> (ymin, ymax)、Noneは自動
+    "preview_ylim",           # プレビューにも縦軸範囲を適用する
+    "chart_x_axis",           # Excelグラフ横軸の追加設定
+    "chart_y_axis",           # Excelグラフ縦軸の追加設定
+    "chart_height_per_file",  # ファイル1つあたりのExcelグラフの高さの増分
+    "figsize",                # プレビューの大きさ（インチ）
+    "legend_loc",             # プレビューの凡例位置
+    "notes",                  # ダウンロードボタンの下に表示する注意書き
+])
+
+
+# IRの横軸の範囲（グラフに表示する範囲）
+_IR_X_RANGE = (500, 4000)
+
+
+def _transmittance_y_range(spectra):
+    # 最大値：ずらした分＋110%T
+    ymax = (len(spectra) - 1) * 40 + 110
+    if not spectra:
+        return None, ymax
+    # %T最小値（最後のファイルの、グラフに表示される範囲の点。なければ全点）
+    x, y = spectra[-1].x, spectra[-1].y
+    visible = (x >= _IR_X_RANGE[0]) & (x <= _IR_X_RANGE[1])
+    if visible.any():
+        y = y[visible]
+    return math.floor(np.min(y) / 10) * 10 - 10, ymax
+
+
+def _absorbance_y_range(spectra):
+    return 0, None
+
+
+IR = Profile(
+    name="IR",
+    export_hint="1. スペクトルマネージャーでテキストファイルをエクスポートする（ファイル名をしっかりつけておく）",
+    x_header="WN",
+    y_header="%T",
+    x_title="Wavenumber / cm–1",
+    y_title="Transmittance (%)",
+    x_plot_title=r'$\mathrm{Wavenumber / cm^{-1}}$',
+    x_web_title="Wavenumber / cm⁻¹",
+    x_range=_IR_X_RANGE,
+    extend_x=False,
+    x_major_unit=500,
+    x_reverse=True,
+    stack=40,
+    y_range=_transmittance_y_range,
+    preview_ylim=True,
+    chart_x_axis={'crossing': 'max'},
+    chart_y_axis={
+        'major_tick_mark': 'none',  # 主目盛を非表示
+        'minor_tick_mark': 'none',  # 補助目盛を非表示
+        'label_position': 'none',  # ラベルを非表示
+        'crossing': -1000,
+    },
+    chart_height_per_file=50,
+    figsize=(8, 8),
+    legend_loc="lower left",
+    notes=[":red[※Excel中のグラフの横軸ラベルの単位-1を手動で上付きにしてください]"],
+)
+
+UV_VIS = Profile(
+    name="UV-vis",
+    export_hint="1. 装置が書き出したテキスト形式ファイルを用意する、もしくは、スペクトルマネージャーでテキストファイルをエクスポートする（ファイル名をしっかりつけておく）",
+    x_header="WL",
+    y_header="Abs",
+    x_title="Wavelength / nm",
+    y_title="Absorbance",
+    x_plot_title="Wavelength / nm",
+    x_web_title="Wavelength / nm",
+    x_range=(300, 700),
+    extend_x=True,
+    x_major_unit=100,
+    x_reverse=False,
+    stack=0,
+    y_range=_absorbance_y_range,
+    preview_ylim=False,
+    chart_x_axis={},
+    chart_y_axis={'major_tick_mark': 'inside'},
+    chart_height_per_file=0,
+    figsize=(8, 6),
+    legend_loc="upper right",
+    notes=[],
+)
+
+PROFILES = {profile.name: profile for profile in (IR, UV_VIS)}
+
+
+def overlay_offsets(num_files, profile):
+    """Y offsets that stack earlier files above later ones."""
+    return [(num_files - 1 - k) * profile.stack for k in range(num_files)]
+
+
+def axis_range(spectra, profile):
+    """Return (xmin, xmax, ymin, ymax) for the spectra; None means automatic."""
+    xmin, xmax = profile.x_range
+    if profile.extend_x:
+        # 最大Xを更新（グラフの横軸最大値の設定）
+        xmax = max([xmax] + [float(np.max(s.x)) for s in spectra])
+    ymin, ymax = profile.y_range(spectra)
+    return xmin, xmax, ymin, ymax
@@ -0,0 +1,98 @@
+"""Opt-in per-stage timing and memory instrumentation.
+
+Enable with the environment variable JASCO_PROFILE=1 (or ?profile=1 on the
+Streamlit page). Set JASCO_PROFILE_LOG to a file path to also append every
+record there as one JSON line.
+
+Peak memory comes from tracemalloc, which is process-wide: on a shared
+server other sessions running at the same time are included in the peak.
+Tracing is on only while at least one stage is being measured, because it
+slows down every allocation in the process. Work done in other processes
+(the parse pool) is not included in CPU time or peak memory.
+"""
+import contextlib
+import datetime
+import json
+import os
+import threading
+import time
+import tracemalloc
+
+
+# 計測中のステージの数（tracemallocは最後のステージが終わったら止める）
+_tracing_lock = threading.Lock()
+_tracing_stages = 0
+_tracing_started = False
+
+
+def _start_tracing():
+    global _tracing_stages, _tracing_started
+    with _tracing_lock:
+        # 外部（PYTHONTRACEMALLOCなど）で始まっていた場合は止めない
+        if _tracing_stages == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _tracing_started = True
+        _tracing_stages += 1
+
+
+def _stop_tracing():
+    global _tracing_stages, _tracing_started
+    with _tracing_lock:
+        _tracing_stages -= 1
+        if _tracing_stages == 0 and _tracing_started:
+            tracemalloc.stop()
+            _tracing_started = False
+
+
+def profiling_enabled():
+    """True when JASCO_PROFILE is set to a non-empty value other than 0."""
+    return os.environ.get("JASCO_PROFILE", "") not in ("", "0")
+
+
+class StageProfiler:
+    """Collects one record per stage: wall time, CPU time, peak memory and extra info."""
+
+    def __init__(self, enabled=True, log_path=None, context=None):
+        self.enabled = enabled
+        self.log_path = log_path if log_path is not None else os.environ.get("JASCO_PROFILE_LOG")
+        # ログの各行に付ける情報（実行ID、手法など）
+        self.context = context or {}
+        self.records = []
+        self._lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def stage(self, name, **info):
+        """Measure the enclosed block; info (e.g. points per file) is stored with the record."""
+        if not self.enabled:
+            yield info
+            return
+        _start_tracing()
+        tracemalloc.reset_peak()
+        start_memory = tracemalloc.get_traced_memory()[0]
+        # CPU時間はこのスレッドの分のみ（Streamlitはセッションごとにスレッドで動く）
+        wall = time.perf_counter()
+        cpu = time.thread_time()
+        try:
+            yield info
+        finally:
+            record = {
+                "stage": name,
+                "wall_s": time.perf_counter() - wall,
+                "cpu_s": time.thread_time() - cpu,
+                "peak_mb": (tracemalloc.get_traced_memory()[1] - start_memory) / 1e6,
+                **info,
+            }
+            _stop_tracing()
+            self._add(record)
+
+    def _add(self, record):
+        with self._lock:
+            self.records.append(record)
+        if self.log_path:
+            line = {"time": datetime.datetime.now().isoformat(timespec="milliseconds"), **self.context, **record}
+            with open(self.log_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(line, ensure_ascii=False) + "\n")
+
+
+# 計測しないときに使う（stage() は何もしない）
+NULL_PROFILER = StageProfiler(enabled=False)
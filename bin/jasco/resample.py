@@ -0,0 +1,48 @@
+import numpy as np
+
+
+def default_step(spectra):
+    """Finest median X spacing among the spectra (the grid keeps every file's resolution)."""
+    steps = [np.median(np.abs(np.diff(s.x))) for s in spectra if len(s.x) > 1]
+    steps = [step for step in steps if step > 0]
+    return float(min(steps)) if steps else 1.0
+
+
+def common_grid(spectra, step=None, max_points=None):
+    """Ascending X grid covering all spectra with the given spacing (default: default_step).
+
+    Raises ValueError, before allocating it, if the grid has more than max_points points.
+    """
+    spectra = [s for s in spectra if len(s.x)]
+    if not spectra:
+        return np.zeros(0)
+    if step is None or step <= 0:
+        step = default_step(spectra)
+    lo = min(float(np.min(s.x)) for s in spectra)
+    hi = max(float(np.max(s.x)) for s in spectra)
+    # np.arange は刻みの誤差が積み重なるので、点数から作る
+    n = int(np.floor((hi - lo) / step + 1e-9)) + 1
+    if max_points is not None and n > max_points:
+        # 上限に収まる最小の間隔を、有効数字3桁に切り上げて示す
+        least = (hi - lo) / (max_points - 1)
+        unit = 10.0 ** (np.floor(np.log10(least)) - 2)
+        raise ValueError(f"横軸の間隔（{step:g}）が細かすぎて、点数（{n}点）が上限（{max_points}点）を超えます。"
+                         f"間隔を{np.ceil(least / unit) * unit:g}以上にしてください。")
+    return lo + step * np.arange(n)
+
+
+def resample(spectra, grid):
+    """Interpolate every spectrum onto grid; returns (files, len(grid)) with NaN outside each range."""
+    table = np.full((len(spectra), len(grid)), np.nan)
+    for k, spectrum in enumerate(spectra):
+        x, y = spectrum.x, spectrum.y
+        if len(x) == 0:
+            continue
+        # np.interp は昇順のXが必要（IRは波数の降順で出力される）
+        if x[0] > x[-1]:
+            x, y = x[::-1], y[::-1]
+        if np.any(np.diff(x) < 0):
+            order = np.argsort(x, kind="stable")
+            x, y = x[order], y[order]
+        table[k] = np.interp(grid, x, y, left=np.nan, right=np.nan)
+    return table
@@ -0,0 +1,279 @@
+"""Watch folders of JASCO exports and keep one workbook per sample set up to date.
+
+Every directory under the watched roots that contains .txt files is a sample
+set, formatted exactly like a DIR argument of the batch command; its workbook
+is named after its path under the root (st1/day1 -> st1_day1_IR.xlsx). Changes are
+found by comparing (mtime, size) snapshots of the .txt files; when watchdog
+is installed, inotify events wake the scan immediately instead of waiting
+for the next polling interval. A sample set is rebuilt only after it has been
+quiet for --settle seconds, so a burst of exports (or a file that is still
+being written) causes one rebuild. Rebuilds run on one worker thread fed by a
+bounded queue, and only files whose snapshot changed are parsed again.
+"""
+import argparse
+import os
+import queue
+import sys
+import threading
+import time
+
+from .cache import LRUStore, spectrum_nbytes
+from .cli import add_output_arguments, batch_name, is_export, warning_messages, write_outputs
+from .parser import read_spectrum
+from .profiles import PROFILES
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:
+    Observer = None
+
+
+def stat_txt(folder, filenames=None):
+    """Return {path: (mtime_ns, size)} for the .txt files directly in folder (see cli.is_export)."""
+    if filenames is None:
+        try:
+            filenames = os.listdir(folder)
+        except OSError:
+            return {}
+    files = {}
+    for filename in filenames:
+        if not is_export(filename):
+            continue
+        path = os.path.join(folder, filename)
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue  # スキャン中に削除された
+        if os.path.isfile(path):
+            files[path] = (st.st_mtime_ns, st.st_size)
+    return files
+
+
+def _parsed_nbytes(entry):
+    # エラー（ValueError）は小さいので一定とみなす
+    _, result = entry
+    return 1024 if isinstance(result, ValueError) else spectrum_nbytes(result)
+
+
+def snapshot(roots):
+    """Return {sample set directory: {path: (mtime_ns, size)}} for the .txt files under roots."""
+    sets = {}
+    for root in roots:
+        for dirpath, _, filenames in os.walk(root):
+            files = stat_txt(dirpath, filenames)
+            if files:
+                sets[dirpath] = files
+    return sets
+
+
+def _is_within(path, root):
+    path, root = os.path.abspath(path), os.path.abspath(root)
+    return os.path.commonpath([path, root]) == root
+
+
+class FolderWatcher:
+    """Incrementally rebuilds the workbook of each sample set whose files changed."""
+
+    def __init__(self, roots, technique, output_dir=".", settle=5.0, queue_size=16,
+                 npz=False, step=None, display="formula", log=None, cache_bytes=256 * 1024 * 1024):
+        self.roots = roots
+        self.technique = technique
+        self.output_dir = output_dir
+        self.settle = settle
+        self.options = {"npz": npz, "step": step, "display": display}
+        self.log = log or (lambda message: print(message, file=sys.stderr))
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.wakeup = threading.Event()
+        self._files = {}      # 前回スキャン時のスナップショット
+        self._dirty = {}      # サンプルセット -> 最後に変更を見つけた時刻
+        self._queued = set()  # キューに入っている（まだ処理されていない）サンプルセット
+        # path -> ((mtime_ns, size), Spectrum または ValueError)。一日中動かしても増え続けないよう容量で制限する
+        self._parsed = LRUStore(cache_bytes, sizeof=_parsed_nbytes)
+        self._lock = threading.Lock()
+
+    def set_name(self, folder):
+        """Name of a sample set: its path under the watched root, joined with "_".
+
+        st1/day1 and st2/day1 under one root become st1_day1 and st2_day1. With
+        several roots, the root's name comes first.
+        """
+        # 入れ子のルートは一番深いものを使う
+        root = max((r for r in self.roots if _is_within(folder, r)), key=len, default=folder)
+        rel = os.path.relpath(folder, root)
+        parts = [] if rel == os.curdir else rel.split(os.sep)
+        if len(self.roots) > 1 or not parts:
+            parts.insert(0, batch_name(root))
+        return "_".join(parts)
+
+    def out_path(self, folder):
+        return os.path.join(self.output_dir, f"{self.set_name(folder)}_{self.technique}.xlsx")
+
+    def _is_stale(self, folder, files):
+        # 起動時：ワークブックがない、または入力より古いものだけを作り直す
+        try:
+            built = os.stat(self.out_path(folder)).st_mtime_ns
+        except OSError:
+            return True
+        return built < max(mtime for mtime, _ in files.values())
+
+    def scan(self, now=None):
+        """Compare a new snapshot with the previous one and queue the sets that have settled."""
+        now = time.monotonic() if now is None else now
+        sets = snapshot(self.roots)
+        first = not self._files and not self._dirty
+        for folder in sets.keys() | self._files.keys():
+            files = sets.get(folder, {})
+            if files == self._files.get(folder, {}):
+                continue
+            if first and not self._is_stale(folder, files):
+                continue
+            self._dirty[folder] = now
+        self._files = sets
+
+        for folder, changed in list(self._dirty.items()):
+            if now - changed < self.settle:
+                continue
+            with self._lock:
+                if folder in self._queued:
+                    # 処理待ちのものがあればそれに任せる（処理時には最新の内容を読む）
+                    del self._dirty[folder]
+                    continue
+                try:
+                    self.queue.put_nowait(folder)
+                except queue.Full:
+                    break  # 次のスキャンで再試行
+                self._queued.add(folder)
+            del self._dirty[folder]
+
+    def _read(self, path, stat):
+        cached = self._parsed.get(path)
+        if cached is not None and cached[0] == stat:
+            return cached[1]
+        try:
+            with open(path, "rb") as f:
+                result = read_spectrum(f, os.path.basename(path))
+        except ValueError as e:
+            result = e
+        self._parsed.put(path, (stat, result))
+        return result
+
+    def build(self, folder):
+        """Parse the changed files of one sample set and rewrite its workbook."""
+        with self._lock:
+            self._queued.discard(folder)
+        files = stat_txt(folder)
+        spectra = []
+        for path in sorted(files):
+            result = self._read(path, files[path])
+            if isinstance(result, ValueError):
+                self.log(f"エラー: {os.path.basename(path)} - {str(result)}")
+            else:
+                spectra.append(result)
+        for message in warning_messages(spectra):
+            self.log(message)
+        if not spectra:
+            return
+        out_path = self.out_path(folder)
+        try:
+            write_outputs(spectra, self.technique, out_path, **self.options)
+        except ValueError as e:
+            # Excelの行数の上限を超える場合など（ファイルが変わるまで作り直さない）
+            self.log(f"エラー: {os.path.basename(out_path)} - {str(e)}")
+            return
+        self.log(f"{out_path} ({len(spectra)} files)")
+
+    def _build_next(self, timeout=None):
+        folder = self.queue.get(timeout=timeout)
+        try:
+            self.build(folder)
+        except Exception as e:  # 1つのサンプルセットの失敗で監視を止めない
+            self.log(f"エラー: {folder} - {e!r}")
+        finally:
+            self.queue.task_done()
+
+    def _worker(self, stop):
+        while not stop.is_set():
+            try:
+                self._build_next(timeout=0.5)
+            except queue.Empty:
+                continue
+
+    def _start_observer(self):
+        if Observer is None:
+            return None
+        watcher = self
+
+        class Handler(FileSystemEventHandler):
+            def on_any_event(self, event):
+                watcher.wakeup.set()
+
+        observer = Observer()
+        for root in self.roots:
+            observer.schedule(Handler(), root, recursive=True)
+        observer.start()
+        return observer
+
+    def run(self, interval=2.0, stop=None, once=False):
+        """Scan every interval seconds (sooner on inotify events) until stop is set.
+
+        With once, build whatever is stale and return.
+        """
+        stop = stop or threading.Event()
+        if once:
+            self.settle = 0
+            # キューが一杯で入らなかったサンプルセットは次のスキャンで入るので、何も入らなくなるまで繰り返す
+            while True:
+                self.scan()
+                if self.queue.empty():
+                    return
+                while not self.queue.empty():
+                    self._build_next()
+        worker = threading.Thread(target=self._worker, args=(stop,), daemon=True)
+        worker.start()
+        observer = self._start_observer()
+        try:
+            while not stop.is_set():
+                self.scan()
+                self.wakeup.wait(interval)
+                self.wakeup.clear()
+        finally:
+            stop.set()
+            if observer is not None:
+                observer.stop()
+                observer.join()
+            worker.join()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("technique", choices=sorted(PROFILES), help="測定手法")
+    parser.add_argument("roots", nargs="+", metavar="DIR", help="監視するフォルダ（サブフォルダも対象）")
+    add_output_arguments(parser)
+    parser.add_argument("--interval", type=float, default=2.0, help="スキャンの間隔（秒）")
+    parser.add_argument("--settle", type=float, default=5.0, help="最後の変更からこの秒数たったら作り直す")
+    parser.add_argument("--queue-size", type=int, default=16, help="処理待ちのサンプルセットの上限")
+    parser.add_argument("--once", action="store_true", help="古いワークブックだけ作り直して終了する")
+    args = parser.parse_args(argv)
+
+    # ルートが複数あるときはルートの名前を先頭に付けるので、同じ名前のルートは区別できない
+    names = [batch_name(root) for root in args.roots]
+    if len(args.roots) > 1 and len(set(names)) < len(names):
+        parser.error("同じ名前のフォルダは一緒に監視できません。別々に実行して --output-dir を分けてください。")
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    watcher = FolderWatcher(
+        args.roots, args.technique, args.output_dir, args.settle, args.queue_size,
+        npz=args.npz, step=args.step if args.wide else None, display=args.display,
+    )
+    if Observer is None and not args.once:
+        print(f"watchdogがないため、{args.interval}秒ごとにスキャンします。", file=sys.stderr)
+    try:
+        watcher.run(args.interval, once=args.once)
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,53 @@
+"""Interactive (Vega-Lite) preview with server-side level of detail.
+
+Only the points inside the visible X range are sent, min/max decimated to a
+per-file budget, so the browser stays responsive with many dense spectra.
+Pan and zoom inside the chart work on the points already sent; narrowing
+the X range on the page sends a more detailed subset.
+"""
+import numpy as np
+
+from .preview import DEFAULT_PREVIEW_POINTS, points_per_trace, window_decimate
+from .profiles import axis_range, overlay_offsets
+
+
+def preview_data(spectra, profile, x_range, max_points=DEFAULT_PREVIEW_POINTS):
+    """Long-format columns (file, x, y) of the decimated, stacked traces inside x_range."""
+    lo, hi = x_range
+    budget = points_per_trace(len(spectra), max_points)
+    names, xs, ys = [], [], []
+    for spectrum, overlayconst in zip(spectra, overlay_offsets(len(spectra), profile)):
+        x, y = window_decimate(spectrum.x, spectrum.y, lo, hi, budget)
+        names.append(np.full(len(x), spectrum.name, dtype=object))
+        xs.append(x)
+        ys.append(y + overlayconst)
+    if not spectra:
+        return {"file": [], "x": [], "y": []}
+    return {"file": np.concatenate(names), "x": np.concatenate(xs), "y": np.concatenate(ys)}
+
+
+def vega_spec(spectra, profile, x_range):
+    """Vega-Lite spec with the profile's axis conventions (reversed IR axis, y range)."""
+    _, _, ymin, ymax = axis_range(spectra, profile)
+    y_scale = {"zero": False}
+    if profile.preview_ylim and ymin is not None:
+        y_scale["domain"] = [ymin, ymax]
+    # "lower left" -> "bottom-left"
+    legend = profile.legend_loc.replace("lower", "bottom").replace("upper", "top").replace(" ", "-")
+    return {
+        "mark": {"type": "line", "strokeWidth": 1.5, "clip": True},
+        "encoding": {
+            "x": {
+                "field": "x", "type": "quantitative", "title": profile.x_web_title,
+                "scale": {"domain": list(x_range), "reverse": profile.x_reverse, "zero": False},
+            },
+            "y": {"field": "y", "type": "quantitative", "title": profile.y_title, "scale": y_scale},
+            "color": {
+                "field": "file", "type": "nominal", "title": None,
+                "sort": [s.name for s in spectra], "legend": {"orient": legend},
+            },
+        },
+        # ドラッグで移動、ホイールで拡大縮小
+        "params": [{"name": "zoom", "select": "interval", "bind": "scales"}],
+        "height": 60 * profile.figsize[1],
+    }
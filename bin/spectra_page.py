@@ -0,0 +1,231 @@
+"""Streamlit page shared by ir.py and uv-vis.py."""
+import streamlit as st
+import datetime
+import io
+import math
+import os
+import numpy as np
+import uuid
+
+from jasco.cache import LRUStore, SpectrumCache, content_key
+from jasco.excel import check_rows, write_wide_workbook, write_workbook
+from jasco.npz import write_npz
+from jasco.parallel import parse_many
+from jasco.preview import DEFAULT_PREVIEW_POINTS
+from jasco.profiles import axis_range
+from jasco.profiling import NULL_PROFILER, StageProfiler, profiling_enabled
+from jasco.webplot import preview_data, vega_spec
+
+# 日本時間（夏時間がないので固定オフセットでよい）
+JST = datetime.timezone(datetime.timedelta(hours=9), "JST")
+
+
+@st.cache_resource
+def shared_stores():
+    """Parsed spectra and built workbooks shared by all sessions of this server process."""
+    # スペクトルは手法によらないので内容のハッシュだけをキーにし、IRとUV-visのページで共有する
+    spectra = SpectrumCache(max_bytes=512 * 1024 * 1024, ttl=6 * 60 * 60)
+    workbooks = LRUStore(max_bytes=256 * 1024 * 1024, ttl=60 * 60)
+    return spectra, workbooks
+
+
+def load_spectra(files, profiler=NULL_PROFILER):
+    # 解析済みの内容は共有キャッシュから取得し、残りはまとめて並列に解析する
+    cache = shared_stores()[0]
+    keys = []
+    results = [None] * len(files)
+    misses = []
+    with profiler.stage("hash", files=len(files)):
+        for i, file in enumerate(files):
+            file.seek(0)
+            key = content_key(file)
+            keys.append(key)
+            results[i] = cache.get(key, file.name)
+            if results[i] is None:
+                misses.append(i)
+    with profiler.stage("parse", files=len(misses), cached=len(files) - len(misses)) as info:
+        # ファイルは処理する直前に1つずつ読むので、全件分のコピーを同時に持たない
+        parsed = parse_many([(files[i], files[i].name) for i in misses])
+        for i, result in zip(misses, parsed):
+            if not isinstance(result, ValueError):
+                cache.put(keys[i], result)
+            results[i] = result
+        # ファイルごとの点数
+        info["points"] = {r.name: len(r.x) for r in results if not isinstance(r, ValueError)}
+
+    # アップロード順に結果をまとめる
+    spectra = []
+    set_keys = []
+    for file, key, result in zip(files, keys, results):
+        if isinstance(result, ValueError):
+            st.error(f"エラー: {file.name} - {str(result)}")
+            continue  # エラーがある場合、このファイルをスキップ
+        spectra.append(result)
+        for warning in result.warnings:
+            st.warning(f"注意: {file.name} - {warning}")
+        set_keys.append((key, file.name))
+
+    return spectra, tuple(set_keys)
+
+
+def convert_files_to_excel(spectra, keys, memo, profile, step=None, display="formula", profiler=NULL_PROFILER):
+    """Build the workbook on demand, shared with every session that uploads the same files.
+
+    step is None for one block per file, or the common grid spacing (0: automatic)
+    for the merged wide table. display is "formula" or "value" for the chart columns.
+    """
+    # 計測結果は次の再実行時に表示する（共有ストアから取得したときは作成の計測結果はない）
+    memo["profile"] = profiler.records
+
+    def build():
+        if step is None:
+            return write_workbook(spectra, profile, profiler, display)
+        return write_wide_workbook(spectra, profile, step or None, profiler, display)
+
+    # 内容のハッシュとファイル名（keys）に手法と出力形式を加えたものをキーにする
+    workbooks = shared_stores()[1]
+    return workbooks.get_or_create((profile.name, keys, step, display), build)
+
+
+def show_profile(records, spectra):
+    """Collapsible panel with the per-stage measurements."""
+    with st.expander("処理時間の計測結果"):
+        st.dataframe([
+            {
+                "stage": r["stage"],
+                "wall [s]": round(r["wall_s"], 4),
+                "CPU [s]": round(r["cpu_s"], 4),
+                "peak [MB]": round(r["peak_mb"], 2),
+            }
+            for r in records
+        ])
+        st.dataframe([{"file": s.name, "points": len(s.x)} for s in spectra])
+        st.caption("parseのCPU時間とメモリのピークには、並列解析のワーカープロセスの分は含まれません。"
+                   "Excelのステージは、このセッションで作成したときだけ表示されます。")
+
+
+def show_interactive_preview(spectra, profile, preview_points, profiler=NULL_PROFILER):
+    """Vega-Lite preview; only the selected X range is sent, at a detail that fits the point budget."""
+    xmin, xmax, _, _ = axis_range(spectra, profile)
+    lo = min([xmin] + [float(np.min(s.x)) for s in spectra])
+    hi = max([xmax] + [float(np.max(s.x)) for s in spectra])
+    # 表示範囲を狭めると、その範囲だけをより細かく送る
+    x_range = st.sidebar.slider(
+        f"表示範囲（{profile.x_header}）", min_value=float(math.floor(lo)), max_value=float(math.ceil(hi)),
+        value=(float(xmin), float(xmax)),
+    )
+    with profiler.stage("preview.draw", files=len(spectra)) as info:
+        data = preview_data(spectra, profile, x_range, preview_points)
+        info["sent_points"] = len(data["x"])
+    with profiler.stage("preview.render"):
+        st.vega_lite_chart(data, vega_spec(spectra, profile, x_range), width="stretch")
+
+
+def convert_files_to_npz(spectra, profile):
+    """Binary export of the parsed spectra for downstream analysis."""
+    output = io.BytesIO()
+    write_npz(spectra, output, profile=profile)
+    return output.getvalue()
+
+
+def run(profile):
+    # タイトル等
+    st.set_page_config(page_title=f"{profile.name} | JASCO Spectra Formatter", page_icon=":bar_chart:", )
+    st.title(f"{profile.name} | JASCO Spectra Formatter")
+    st.markdown("**:blue[※動作にはインターネット接続が必要です。]**")
+    st.write(profile.export_hint)
+    st.write("2. 以下にドラッグ&ドロップしてグラフ表示。複数ファイルからプロット重ね書きも可能")
+    st.write("3. Excelファイルをダウンロード")
+    st.write("4. 別のExcelファイルを作成する場合は、ページを再読込するかアップロード済みファイルをすべて✕ボタンで削除する")
+    st.write("")
+
+    # 計測モード（環境変数 JASCO_PROFILE=1 または URLに ?profile=1）
+    enabled = profiling_enabled() or st.query_params.get("profile") == "1"
+    run_id = uuid.uuid4().hex[:12]
+    profiler = StageProfiler(enabled, context={"run": run_id, "technique": profile.name})
+
+    # プレビューの点数（1ファイルあたり）。Excelには全点を出力する
+    preview_points = st.sidebar.number_input(
+        "プレビューの最大点数（1ファイルあたり）",
+        min_value=200, max_value=100000, value=DEFAULT_PREVIEW_POINTS, step=200,
+    )
+
+    # プレビューの種類：静止画（matplotlib）またはブラウザで拡大・移動できるグラフ
+    interactive = st.sidebar.radio("プレビュー", ["静止画", "インタラクティブ"]) == "インタラクティブ"
+
+    # Excelの形式：ファイルごとのX・Y列、または共通の横軸に補間した1つの表
+    layout = st.sidebar.radio("Excelの形式", ["ファイルごと", "共通の横軸にそろえる"])
+    step = None
+    if layout == "共通の横軸にそろえる":
+        step = st.sidebar.number_input(
+            f"横軸の間隔（{profile.x_header}、0で自動）", min_value=0.0, value=0.0, step=0.5,
+        )
+
+    # グラフ用の列：値で出力するとExcelでの計算式の再計算がなくなり、開くのが速い
+    display = "value" if st.sidebar.checkbox(
+        "グラフ用の列を計算式ではなく値で出力する（大きなファイル向け）",
+        help="倍率・補正定数を変えたときは、グラフ用の列の3行目のセルのフィルハンドルをダブルクリックして再計算します。",
+    ) else "formula"
+
+    # ファイルアップロード
+    uploaded_files = st.file_uploader(
+        "エクスポートしたtxtファイルをアップロード（複数可）",
+        type=["txt"], 
+        accept_multiple_files=True                         
+    )
+
+    if uploaded_files:
+        # 現在の日本時間（JST）を取得
+        current_date = datetime.datetime.now(JST).strftime("%Y%m%d")
+        current_time = datetime.datetime.now(JST).strftime("%H%M%S")
+        file_name = f"{current_date}_{profile.name}_{current_time}.xlsx"
+        
+        # ファイルの読み取り
+        spectra, keys = load_spectra(uploaded_files, profiler)
+
+        # Excel変換はダウンロードボタンが押されたときに行う（計測結果はセッションごとに保持）
+        workbook_memo = st.session_state.setdefault(f"workbook_{profile.name}", {})
+
+        # すべてのファイルが読めなかった場合は、ダウンロードとグラフを出さない
+        if spectra:
+            try:
+                # Excelの行数の上限を超えるなら、ボタンを押す前に知らせる
+                check_rows(spectra, step)
+            except ValueError as e:
+                st.error(f"エラー: {str(e)}")
+            else:
+                st.download_button(
+                    label="Excelファイルをダウンロード",
+                    data=lambda: convert_files_to_excel(
+                        spectra, keys, workbook_memo, profile, step, display,
+                        StageProfiler(enabled, context={"run": run_id, "technique": profile.name}),
+                    ),
+                    file_name=file_name,  # 動的に生成したファイル名を指定
+                    mime='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+                )
+            # 後段の解析用に、解析済みスペクトルをバイナリ（.npz）でも出力できる
+            st.download_button(
+                label="NPZファイルをダウンロード",
+                data=lambda: convert_files_to_npz(spectra, profile),
+                file_name=os.path.splitext(file_name)[0] + ".npz",
+                mime='application/octet-stream',
+            )
+            for note in profile.notes:
+                st.markdown(note)
+        
+            # Streamlitでグラフを表示
+            st.text("\n")
+            if interactive:
+                show_interactive_preview(spectra, profile, preview_points, profiler)
+            else:
+                # 表示用グラフの作成（matplotlibはここで初めて読み込む）
+                from jasco.plot import draw_preview, new_figure
+
+                with profiler.stage("preview.draw", files=len(spectra)):
+                    fig, ax = new_figure(profile)
+                    draw_preview(ax, spectra, profile, preview_points)
+                with profiler.stage("preview.render"):
+                    st.pyplot(fig)
+
+        if enabled:
+            show_profile(profiler.records + workbook_memo.get("profile", []), spectra)
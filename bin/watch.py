@@ -0,0 +1,10 @@
+"""Keep Excel workbooks up to date while JASCO exports arrive in shared folders.
+
+    python bin/watch.py IR /shared/ir_exports -o /shared/ir_workbooks --settle 10
+"""
+import sys
+
+from jasco.watch import main
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,61 @@
+"""Cold import time of the formatter modules, checked against a budget.
+
+Each module is imported in a fresh interpreter (best of REPEAT runs). Heavy
+libraries that a module must not load at import time are checked too; they
+are imported only on the code paths that use them. On a slow machine, loosen
+the budgets with JASCO_IMPORT_BUDGET_SCALE=2.
+"""
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+BIN = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "bin")
+
+# (モジュール, 予算（秒）, 読み込まれてはいけないモジュール)
+TARGETS = [
+    ("jasco", 0.5, ["matplotlib", "xlsxwriter", "pandas", "streamlit"]),
+    ("jasco.cli", 0.5, ["matplotlib", "xlsxwriter", "pandas", "streamlit"]),
+    ("jasco.watch", 0.5, ["matplotlib", "xlsxwriter", "pandas", "streamlit"]),
+    ("spectra_page", 1.5, ["matplotlib", "xlsxwriter", "pandas"]),
+]
+REPEAT = 3
+
+_CHILD = """
+import json, sys, time
+t0 = time.perf_counter()
+import {module}
+seconds = time.perf_counter() - t0
+print(json.dumps({{"seconds": seconds, "loaded": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def budget_scale():
+    return float(os.environ.get("JASCO_IMPORT_BUDGET_SCALE", "1"))
+
+
+def measure(module, heavy):
+    """Import module in a new interpreter; return (seconds, heavy modules that got loaded)."""
+    out = subprocess.run(
+        [sys.executable, "-c", _CHILD.format(module=module, heavy=heavy)],
+        cwd=BIN, capture_output=True, text=True, check=True,
+    ).stdout
+    result = json.loads(out.strip().splitlines()[-1])
+    return result["seconds"], result["loaded"]
+
+
+def best_of(module, heavy, repeat=REPEAT):
+    """(best seconds, heavy modules loaded in any run) over repeat imports."""
+    runs = [measure(module, heavy) for _ in range(repeat)]
+    return min(s for s, _ in runs), sorted({m for _, mods in runs for m in mods})
+
+
+@pytest.mark.parametrize("module, budget, heavy", TARGETS, ids=[t[0] for t in TARGETS])
+def test_import_time(module, budget, heavy):
+    if module == "spectra_page":
+        pytest.importorskip("streamlit")
+    seconds, loaded = best_of(module, heavy)
+    assert not loaded, f"{module} loads {', '.join(loaded)} at import time"
+    assert seconds <= budget * budget_scale(), f"{module}: {seconds:.3f} s (budget {budget * budget_scale():.2f} s)"
@@ -0,0 +1,68 @@
+import io
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "bin"))
+from jasco.npz import load_npz, write_npz  # noqa: E402
+from jasco.parser import Spectrum  # noqa: E402
+from jasco.profiles import PROFILES  # noqa: E402
+
+
+def sample_spectra():
+    rng = np.random.default_rng(0)
+    spectra = []
+    for k, n in enumerate([500, 1, 1200]):
+        x = np.linspace(4000, 400, n)
+        header = {"TITLE": f"試料{k}", "NPOINTS": str(n)}
+        spectra.append(Spectrum(f"sample{k}.txt", header, x, rng.normal(size=n)))
+    return spectra
+
+
+def assert_round_trip(spectra, loaded, dtype):
+    assert len(loaded) == len(spectra)
+    for a, b in zip(spectra, loaded):
+        assert b.name == a.name
+        assert b.header == a.header
+        assert b.x.dtype == dtype and b.y.dtype == dtype
+        np.testing.assert_array_equal(b.x, a.x.astype(dtype))
+        np.testing.assert_array_equal(b.y, a.y.astype(dtype))
+
+
+@pytest.mark.parametrize("dtype", [np.float64, np.float32])
+@pytest.mark.parametrize("mmap", [True, False])
+def test_round_trip_path(tmp_path, dtype, mmap):
+    spectra = sample_spectra()
+    path = tmp_path / "spectra.npz"
+    write_npz(spectra, path, dtype=dtype, profile=PROFILES["IR"])
+    loaded, profile = load_npz(path, mmap=mmap)
+    assert profile == "IR"
+    assert_round_trip(spectra, loaded, dtype)
+    # メモリマップは読み取り専用のビュー
+    assert isinstance(loaded[0].x.base, np.memmap) == mmap
+    if mmap:
+        with pytest.raises(ValueError):
+            loaded[0].x[0] = 0
+
+
+@pytest.mark.parametrize("dtype", [np.float64, np.float32])
+def test_round_trip_file_object(dtype):
+    spectra = sample_spectra()
+    buffer = io.BytesIO()
+    write_npz(spectra, buffer, dtype=dtype)
+    buffer.seek(0)
+    # ファイルオブジェクトはメモリマップできないので、読み込んで返す
+    loaded, profile = load_npz(buffer, mmap=True)
+    assert profile == ""
+    assert_round_trip(spectra, loaded, dtype)
+
+
+@pytest.mark.parametrize("mmap", [True, False])
+def test_empty_set(tmp_path, mmap):
+    path = tmp_path / "empty.npz"
+    write_npz([], path)
+    loaded, profile = load_npz(path, mmap=mmap)
+    assert loaded == []
+    assert profile == ""
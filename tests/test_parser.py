@@ -0,0 +1,191 @@
+import io
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "bin"))
+from jasco.parser import parse_spectrum, read_spectrum  # noqa: E402
+
+LINEAR_TRAILER = [
+    "",
+    "##### Extended Information",
+    "",
+    "[Comments]",
+    "Data array type\tLinear data array",
+]
+
+
+def export(xs, ys, npoints=None, title="sample", trailer=LINEAR_TRAILER, encoding="cp932", newline="\r\n"):
+    """A JASCO text export; xs and ys are written as given (strings are kept verbatim)."""
+    xs = [x if isinstance(x, str) else f"{x:.2f}" for x in xs]
+    ys = [y if isinstance(y, str) else f"{y:.6f}" for y in ys]
+    lines = [
+        f"TITLE\t{title}",
+        "DATA TYPE\tINFRARED SPECTRUM",
+        "XUNITS\t1/CM",
+        "YUNITS\t%T",
+        f"FIRSTX\t{xs[0]}",
+        f"LASTX\t{xs[-1]}",
+        f"NPOINTS\t{len(xs) if npoints is None else npoints}",
+        "XYDATA",
+    ]
+    lines += [f"{x}\t{y}" for x, y in zip(xs, ys)]
+    lines += trailer
+    return (newline.join(lines) + newline).encode(encoding)
+
+
+def both(data, chunk_size=64):
+    """Parse data with the bytes parser and the streaming parser (small chunks)."""
+    return parse_spectrum(data, "a.txt"), read_spectrum(io.BytesIO(data), "a.txt", chunk_size=chunk_size)
+
+
+def assert_same(a, b):
+    assert a.header == b.header
+    assert a.warnings == b.warnings
+    np.testing.assert_array_equal(a.x, b.x)
+    np.testing.assert_array_equal(a.y, b.y)
+
+
+def test_linear_x_keeps_values_of_integer_first_token():
+    # 先頭だけ小数部がない：以前は0桁に丸めて整数のXを返していた
+    n = 200
+    values = 4000 - 0.51444 * np.arange(n)
+    xs = ["4000"] + [f"{x:.2f}" for x in values[1:]]
+    spectrum = parse_spectrum(export(xs, np.ones(n)))
+    np.testing.assert_array_equal(spectrum.x, [float(x) for x in xs])
+
+
+def test_linear_x_matches_full_parse():
+    n = 5000
+    xs = np.linspace(4000, 400, n)
+    ys = np.sin(xs / 100)
+    linear = parse_spectrum(export(xs, ys))
+    full = parse_spectrum(export(xs, ys, trailer=[]))
+    assert_same(linear, full)
+    np.testing.assert_array_equal(linear.x, [float(f"{x:.2f}") for x in xs])
+
+
+def test_linear_x_with_rounded_header_keeps_file_values():
+    # ヘッダーの両端はデータと同じ桁数でも、そこから求めた間隔は丸められている
+    n = 7993
+    xs = [f"{x:.2f}" for x in np.linspace(6565.31, 896.84, n)]
+    spectrum, streamed = both(export(xs, np.ones(n)), chunk_size=4096)
+    np.testing.assert_array_equal(spectrum.x, [float(x) for x in xs])
+    assert_same(spectrum, streamed)
+
+
+def test_linear_trailer_with_one_irregular_x_is_parsed():
+    # 等間隔と書かれていても、ファイルのXをそのまま使う（1点だけ違う場合も）
+    n = 1000
+    xs = np.linspace(4000, 400, n)
+    xs[n // 2 + 7] += 0.3
+    spectrum = parse_spectrum(export(xs, np.ones(n)))
+    np.testing.assert_array_equal(spectrum.x, [float(f"{x:.2f}") for x in xs])
+
+
+@pytest.mark.parametrize("row, message", [("garbage\t1.0", "数値"), ("1.0\t2.0\t3.0", "列数")])
+def test_malformed_row_in_linear_array_is_rejected(row, message):
+    # 抜き取り検査では見つからない途中の1行でも、どちらの解析でも弾く
+    n = 1000
+    xs = [f"{x:.2f}" for x in np.linspace(4000, 400, n)]
+    ys = [f"{1.0:.6f}"] * n
+    data = export(xs, ys)
+    bad = f"{xs[n // 2 + 7]}\t{ys[0]}".encode()
+    assert data.count(bad) == 1
+    data = data.replace(bad, row.encode())
+    for parse in (lambda d: parse_spectrum(d), lambda d: read_spectrum(io.BytesIO(d))):
+        with pytest.raises(ValueError, match=message):
+            parse(data)
+
+
+@pytest.mark.parametrize("encoding", ["cp932", "utf-8", "utf-8-sig", "utf-16"])
+def test_streaming_matches_bytes(encoding):
+    n = 300
+    xs = np.linspace(800, 200, n)
+    data = export(xs, np.cos(xs), title="試料①", encoding=encoding)
+    spectrum, streamed = both(data)
+    assert spectrum.header["TITLE"] == "試料①"
+    assert_same(spectrum, streamed)
+
+
+def test_encoding_detected_beyond_first_chunk():
+    # 最初のチャンク（64バイト）はASCIIだけで、日本語はその後ろのヘッダーにある
+    n = 50
+    xs = np.linspace(800, 200, n)
+    data = export(xs, np.ones(n), encoding="utf-8").replace(b"YUNITS\t%T", "YUNITS\t%T\r\nOWNER\t山田太郎研究室".encode())
+    assert data.index("山田".encode()) > 64
+    spectrum, streamed = both(data, chunk_size=64)
+    assert streamed.header["OWNER"] == "山田太郎研究室"
+    assert_same(spectrum, streamed)
+
+
+def test_utf8_trailer_after_ascii_header():
+    # ヘッダーはASCII（cp932と判定）で、Extended InformationだけにUTF-8の日本語がある
+    n = 50
+    xs = np.linspace(800, 200, n)
+    trailer = ["", "##### Extended Information", "測定者\t山田"]
+    data = export(xs, np.ones(n), trailer=trailer, encoding="utf-8")
+    # 最初のチャンクがASCIIだけで、データの終端と日本語が同じチャンクに入る場合を含める
+    for chunk_size in range(16, len(data) + 1, 7):
+        assert_same(*both(data, chunk_size))
+
+
+def test_unreadable_header_is_rejected_by_both():
+    data = export(np.linspace(800, 200, 10), np.ones(10)).replace(b"sample", b"\x82\xff")
+    for parse in (lambda d: parse_spectrum(d), lambda d: read_spectrum(io.BytesIO(d))):
+        with pytest.raises(ValueError, match="文字コード"):
+            parse(data)
+
+
+def test_not_a_jasco_file():
+    data = b"wavenumber,transmittance\n4000,99.1\n"
+    for parse in (lambda d: parse_spectrum(d), lambda d: read_spectrum(io.BytesIO(d))):
+        with pytest.raises(ValueError, match="日本分光"):
+            parse(data)
+
+
+def test_block_ends_at_blank_line():
+    n = 20
+    xs = np.linspace(800, 200, n)
+    data = export(xs, np.ones(n), trailer=["", "1\t2\t3"])
+    spectrum, streamed = both(data, chunk_size=16)
+    assert len(spectrum.x) == n
+    assert_same(spectrum, streamed)
+
+
+def test_npoints_mismatch_is_repaired():
+    n = 30
+    data = export(np.linspace(800, 200, n), np.ones(n), npoints=40)
+    spectrum, streamed = both(data)
+    assert len(spectrum.x) == n
+    assert "NPOINTS" in spectrum.warnings[0]
+    assert_same(spectrum, streamed)
+
+
+def test_non_finite_points_are_dropped():
+    n = 10
+    ys = ["1.0"] * n
+    ys[3] = "nan"
+    ys[7] = "inf"
+    spectrum, streamed = both(export(np.linspace(800, 200, n), ys, trailer=[]))
+    assert len(spectrum.x) == n - 2
+    assert np.isfinite(spectrum.y).all()
+    assert len(spectrum.warnings) == 1
+    assert_same(spectrum, streamed)
+
+
+@pytest.mark.parametrize("row", ["1.0\t2.0\t3.0", "1.0"])
+def test_wrong_column_count(row):
+    data = export(["800.00"], ["1.0"], trailer=[]).replace(b"800.00\t1.0", row.encode())
+    for parse in (lambda d: parse_spectrum(d), lambda d: read_spectrum(io.BytesIO(d))):
+        with pytest.raises(ValueError, match="列数"):
+            parse(data)
+
+
+def test_empty_block():
+    data = export(["800.00"], ["1.0"], trailer=[]).replace(b"800.00\t1.0\r\n", b"\r\n")
+    for parse in (lambda d: parse_spectrum(d), lambda d: read_spectrum(io.BytesIO(d))):
+        with pytest.raises(ValueError, match="空"):
+            parse(data)